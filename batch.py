@@ -0,0 +1,112 @@
+import argparse
+import configparser
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from process_cards import ImageProcessor
+from image_utils import OverlayCompositor, create_overlay_images
+from board_layout import BoardGeometry
+
+# Satu sesi = satu folder berisi config.ini, positions.json dan Screenshot_*.png (langsung atau di subfolder input/).
+# Path di config.ini milik PC perekam, jadi file dicari relatif terhadap folder sesi.
+
+def find_sessions(root):
+    sessions = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isfile(os.path.join(path, "config.ini")) and os.path.isfile(os.path.join(path, "positions.json")):
+            sessions.append(path)
+    return sessions
+
+def session_input_folder(session):
+    if glob.glob(os.path.join(session, "Screenshot_*.png")):
+        return session
+    return os.path.join(session, "input")
+
+def process_session(session, render_folder=None, threshold=None, metric="absdiff", candidates="auto"):
+    timings = {}
+    record = {"session": os.path.basename(os.path.normpath(session)), "pairs": [], "timings": timings}
+    try:
+        start = time.perf_counter()
+        config = configparser.ConfigParser()
+        config.read(os.path.join(session, "config.ini"))
+        with open(os.path.join(session, "positions.json"), "r", encoding="utf-8") as f:
+            offsets = json.load(f)
+        border = tuple(int(config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+        # Geometri papan dari config sesi itu sendiri: sesi dari event lain bisa dicampur dalam satu batch
+        geometry = BoardGeometry.from_config(config)
+        # Paralelisme ada di level proses, jadi tiap sesi cukup satu thread
+        process = ImageProcessor(session_input_folder(session), None, geometry.box_size, False, border, 1, geometry.per_capture, geometry.threshold)
+        timings["load"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        process.process_cropping(offsets)
+        timings["crop"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matched_pairs = process.process_matching(threshold, metric=metric, candidates=candidates)
+        timings["match"] = time.perf_counter() - start
+
+        record["cards"] = int(process.found.sum())
+        record["pairs"] = process.match_records()
+
+        if render_folder:
+            start = time.perf_counter()
+            output_folder = os.path.join(render_folder, record["session"])
+            os.makedirs(output_folder, exist_ok=True)
+            screen_width = int(config['resolusi']['lebar'])
+            screen_height = int(config['resolusi']['tinggi'])
+            compositor = OverlayCompositor(offsets, screen_width, screen_height, border, geometry.box_size)
+            create_overlay_images(matched_pairs, offsets, output_folder, screen_width, screen_height, *border, geometry.box_size, compositor)
+            timings["render"] = time.perf_counter() - start
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+def run_batch(sessions, output, workers=None, render_folder=None, **options):
+    results = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, "w", encoding="utf-8") as f:
+        futures = {pool.submit(process_session, session, render_folder, **options): session for session in sessions}
+        for future in as_completed(futures):
+            record = future.result()
+            # Satu baris JSON per sesi (urutan sesuai sesi yang selesai lebih dulu)
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            results += 1
+            if "error" in record:
+                failed += 1
+                print(f"❌ {record['session']}: {record['error']}")
+            else:
+                print(f"✅ {record['session']}: {len(record['pairs'])} pasangan")
+    return results, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proses ulang banyak sesi rekaman sekaligus")
+    parser.add_argument("sessions", help="folder yang berisi folder-folder sesi")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="file hasil (JSON Lines)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="jumlah proses (default: jumlah CPU)")
+    parser.add_argument("--render", metavar="FOLDER", default=None, help="simpan PNG overlay per sesi ke folder ini")
+    parser.add_argument("--threshold", type=float, default=None, help="default: [papan] threshold di config tiap sesi")
+    parser.add_argument("--metric", choices=("absdiff", "ncc"), default="absdiff")
+    parser.add_argument("--candidates", choices=("auto", "all", "hash", "coarse"), default="auto")
+    args = parser.parse_args(argv)
+
+    sessions = find_sessions(args.sessions)
+    if not sessions:
+        print(f"⚠️ Tidak ada sesi di {args.sessions}")
+        return 1
+    start = time.perf_counter()
+    results, failed = run_batch(
+        sessions, args.output, args.workers, args.render,
+        threshold=args.threshold, metric=args.metric, candidates=args.candidates,
+    )
+    print(f"Selesai: {results} sesi, {failed} gagal, {time.perf_counter() - start:.1f} detik → {args.output}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
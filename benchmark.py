@@ -0,0 +1,168 @@
+import argparse
+import configparser
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from process_cards import ImageProcessor
+from image_utils import OverlayCompositor, create_overlay_images
+from presenter import HeadlessPresenter
+from frame_diff import diff_overlays
+from synthetic_board import generate_session
+from board_layout import DEFAULT_GEOMETRY, BoardGeometry, build_positions
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+def timed(func, repeat):
+    runs = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+def summarize(runs):
+    return {"min": min(runs), "median": statistics.median(runs), "max": max(runs), "runs": runs}
+
+def present_all(compositor, frames):
+    # Siklus tampilan lengkap di backend headless: patch back buffer, hitung area kotor, present
+    presenter = HeadlessPresenter()
+    presenter.create_surface(compositor.origin, (compositor.width, compositor.height), compositor.base_bgra)
+    front = None
+    for overlay in frames:
+        buffer = presenter.back_buffer()
+        compositor.patch(buffer["pixels"], overlay, buffer["overlay"])
+        buffer["overlay"] = overlay
+        dirty = diff_overlays(front, overlay, presenter.size)
+        if dirty:
+            presenter.present(dirty)
+        front = overlay
+    return presenter
+
+def bench_resolution(folder, name, width, height, repeat, workers, noise, brightness, jitter, seed, geometry=DEFAULT_GEOMETRY):
+    session = generate_session(os.path.join(folder, name), width, height, noise=noise, brightness=brightness, jitter=jitter, seed=seed, geometry=geometry)
+    box_size = geometry.box_size
+    config = configparser.ConfigParser()
+    config.read(session["config"])
+    offsets = session["positions"]
+    border = tuple(int(config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+    stages = {}
+
+    # Processor baru tiap putaran supaya screenshot benar-benar didecode ulang
+    def crop():
+        process = ImageProcessor(config['folder']['input'], config['folder']['process'], box_size, False, border, workers, geometry.per_capture, geometry.threshold)
+        process.process_cropping(offsets)
+        return process
+    process, runs = timed(crop, repeat)
+    stages["process_cropping"] = summarize(runs)
+
+    matched_pairs, runs = timed(lambda: process.process_matching(geometry.threshold), repeat)
+    stages["process_matching"] = summarize(runs)
+
+    compositor, runs = timed(lambda: OverlayCompositor(offsets, width, height, border, box_size), repeat)
+    stages["overlay_compositor"] = summarize(runs)
+
+    frames, runs = timed(lambda: create_overlay_images(matched_pairs, offsets, None, width, height, *border, box_size, compositor), repeat)
+    stages["create_overlay_images"] = summarize(runs)
+
+    export = os.path.join(folder, name, "output")
+    _, runs = timed(lambda: create_overlay_images(matched_pairs, offsets, export, width, height, *border, box_size, compositor), repeat)
+    stages["create_overlay_images_png"] = summarize(runs)
+
+    # Memuat overlay = merasterisasi deskripsi menjadi buffer BGRA yang siap ditampilkan
+    _, runs = timed(lambda: [compositor.rasterize(overlay) for overlay in frames], repeat)
+    stages["overlay_load"] = summarize(runs)
+
+    presenter, runs = timed(lambda: present_all(compositor, frames), repeat)
+    stages["present_cycle"] = summarize(runs)
+    stages["present_frame"] = summarize(presenter.timings)
+
+    correct = sorted(tuple(sorted(pair)) for pair in matched_pairs) == session["pairs"]
+    return {
+        "resolution": name,
+        "width": width,
+        "height": height,
+        "cards": len(offsets),
+        "pairs": len(matched_pairs),
+        "correct": correct,
+        "stages": stages,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tiap tahap pipeline dengan papan sintetis")
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("-r", "--resolutions", default=",".join(RESOLUTIONS), help="daftar dipisah koma, mis. 720p,4k atau 1600x900")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker ImageProcessor")
+    parser.add_argument("--noise", type=float, default=3.0, help="sigma noise Gaussian")
+    parser.add_argument("--brightness", type=float, default=8.0, help="pergeseran kecerahan maksimum per screenshot")
+    parser.add_argument("--jitter", type=float, default=0.4, help="pergeseran sub-piksel maksimum wajah kartu")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", metavar="FOLDER", default=None, help="simpan sesi sintetis di folder ini")
+    parser.add_argument("--board", default=None, metavar="BARISxKOLOM", help="ukuran papan, mis. 20x25 (default: 5x6)")
+    args = parser.parse_args(argv)
+
+    geometry = DEFAULT_GEOMETRY
+    if args.board:
+        try:
+            rows, cols = (int(v) for v in args.board.lower().split("x"))
+            geometry = BoardGeometry.validated(*geometry._replace(rows=rows, cols=cols))
+        except ValueError as e:
+            parser.error(f"--board {args.board}: {e}")
+
+    resolutions = []
+    for name in args.resolutions.split(","):
+        name = name.strip().lower()
+        if name in RESOLUTIONS:
+            resolutions.append((name, *RESOLUTIONS[name]))
+        else:
+            width, height = (int(v) for v in name.split("x"))
+            resolutions.append((name, width, height))
+    for name, width, height in resolutions:
+        try:
+            build_positions(width, height, geometry)
+        except ValueError as e:
+            parser.error(f"{name}: {e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.keep or tmp
+        results = []
+        for name, width, height in resolutions:
+            result = bench_resolution(folder, name, width, height, args.repeat, args.workers, args.noise, args.brightness, args.jitter, args.seed, geometry)
+            results.append(result)
+            line = ", ".join(f"{stage} {stats['median'] * 1000:.2f} ms" for stage, stats in result["stages"].items())
+            print(f"{name} ({'OK' if result['correct'] else 'SALAH'}): {line}")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "options": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.output}")
+    return 0 if all(result["correct"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
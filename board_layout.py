@@ -0,0 +1,130 @@
+from collections import namedtuple
+
+# Geometri papan Memory Game (jendela game 800x600 di tengah layar), dipakai create_config dan generator sintetis.
+# Default = papan Lost Saga 6x5; event lain cukup mengisi section [papan] di config.ini.
+
+GAME_WIDTH = 800
+GAME_HEIGHT = 600
+COLS = 6
+ROWS = 5
+JARAK_X = 64
+JARAK_Y = 60
+BOX_SIZE = 52
+PER_CAPTURE = 2
+THRESHOLD = 0.9
+
+class BoardGeometry(namedtuple("BoardGeometry", ["rows", "cols", "box_size", "per_capture", "jarak_x", "jarak_y", "threshold"])):
+    @classmethod
+    def from_config(cls, config):
+        # Config lama tanpa [papan] tetap berarti papan 6x5
+        return cls.validated(
+            config.getint('papan', 'baris', fallback=ROWS),
+            config.getint('papan', 'kolom', fallback=COLS),
+            config.getint('papan', 'box', fallback=BOX_SIZE),
+            config.getint('papan', 'kartu_per_screenshot', fallback=PER_CAPTURE),
+            config.getint('papan', 'jarak_x', fallback=JARAK_X),
+            config.getint('papan', 'jarak_y', fallback=JARAK_Y),
+            config.getfloat('papan', 'threshold', fallback=THRESHOLD),
+        )
+
+    @classmethod
+    def validated(cls, *values):
+        geometry = cls(*values)
+        keys = {"rows": "baris", "cols": "kolom", "box_size": "box", "per_capture": "kartu_per_screenshot", "jarak_x": "jarak_x", "jarak_y": "jarak_y"}
+        for name, key in keys.items():
+            if getattr(geometry, name) <= 0:
+                raise ValueError(f"[papan] {key} harus lebih dari 0, bukan {getattr(geometry, name)}")
+        if geometry.cards % 2:
+            raise ValueError(f"[papan] {geometry.rows}x{geometry.cols} = {geometry.cards} kartu, jumlah kartu harus genap")
+        return geometry
+
+    @property
+    def cards(self):
+        return self.rows * self.cols
+
+DEFAULT_GEOMETRY = BoardGeometry(ROWS, COLS, BOX_SIZE, PER_CAPTURE, JARAK_X, JARAK_Y, THRESHOLD)
+
+def build_positions(screen_width, screen_height, geometry=DEFAULT_GEOMETRY):
+    offset_x = (screen_width - GAME_WIDTH) // 2
+    offset_y = (screen_height - GAME_HEIGHT) // 2 + 5
+
+    tikum_x = offset_x + 44
+    tikum_y = offset_y + 183
+
+    # Papan yang lebih besar dari jendela game 6x5 diletakkan di tengah layar
+    grid_width = geometry.jarak_x * (geometry.cols - 1) + geometry.box_size
+    grid_height = geometry.jarak_y * (geometry.rows - 1) + geometry.box_size
+    if grid_width > screen_width or grid_height > screen_height:
+        raise ValueError(f"papan {geometry.rows}x{geometry.cols} ({grid_width}x{grid_height} px) tidak muat di layar {screen_width}x{screen_height}")
+    if tikum_x + grid_width > screen_width:
+        tikum_x = (screen_width - grid_width) // 2
+    if tikum_y + grid_height > screen_height:
+        tikum_y = (screen_height - grid_height) // 2
+
+    arr_x = [geometry.jarak_x * n + tikum_x for n in range(geometry.cols)]
+    arr_y = [geometry.jarak_y * n + tikum_y for n in range(geometry.rows)]
+
+    positions = {}
+    no = 1
+    for i in range(geometry.rows):
+        for j in range(geometry.cols):
+            positions[no] = {"x": arr_x[j], "y": arr_y[i]}
+            no += 1
+    return positions
+
+def check_positions(positions, screen_width, screen_height, box_size=BOX_SIZE):
+    # Kartu di luar layar tidak bisa di-crop maupun dilubangi di overlay: gagal di awal dengan pesan jelas
+    outside = [key for key, coords in positions.items()
+               if coords["x"] < 0 or coords["y"] < 0 or coords["x"] + box_size > screen_width or coords["y"] + box_size > screen_height]
+    if outside:
+        raise ValueError(f"{len(outside)} kartu di luar layar {screen_width}x{screen_height} (mis. kartu {outside[0]}), buat ulang config")
+
+def check_layout(config, positions):
+    # Dipakai check_config, OverlayWorker dan CLI: [papan] valid, jumlah kartu di positions.json sesuai
+    # baris x kolom, dan semua kartu ada di layar. Mengembalikan geometri yang sudah divalidasi.
+    geometry = BoardGeometry.from_config(config)
+    if len(positions) != geometry.cards:
+        raise ValueError(f"positions.json berisi {len(positions)} kartu, sedangkan [papan] {geometry.rows}x{geometry.cols} butuh "
+                         f"{geometry.cards}; hapus positions.json lalu tekan 'Create Config'")
+    check_positions(positions, int(config['resolusi']['lebar']), int(config['resolusi']['tinggi']), geometry.box_size)
+    return geometry
+
+def build_border(positions, box_size=BOX_SIZE):
+    # Pojok dari koordinat (bukan nomor kartu), jadi tetap benar untuk hasil kalibrasi dengan urutan apa pun
+    xs = [coords["x"] for coords in positions.values()]
+    ys = [coords["y"] for coords in positions.values()]
+    x1 = min(xs) - 14
+    y1 = min(ys) - 8
+    x2 = max(xs) + box_size + 14
+    y2 = max(ys) + box_size + 8
+    return x1, y1, x2, y2
+
+def write_config(config_path, screen_width, screen_height, input_path, process_path, output_path, border, offset_path="positions.json", geometry=DEFAULT_GEOMETRY):
+    with open(config_path, "w") as config:
+        config.write("[resolusi]\n")
+        config.write(f"lebar={screen_width}\n")
+        config.write(f"tinggi={screen_height}\n\n")
+
+        config.write("[json]\n")
+        config.write(f"offset={offset_path}\n\n")
+
+        config.write("[folder]\n")
+        config.write(f"input={input_path}\n")
+        config.write(f"process={process_path}\n")
+        config.write(f"output={output_path}\n\n")
+
+        x1, y1, x2, y2 = border
+        config.write("[border]\n")
+        config.write(f"x1={x1}\n")
+        config.write(f"y1={y1}\n")
+        config.write(f"x2={x2}\n")
+        config.write(f"y2={y2}\n\n")
+
+        config.write("[papan]\n")
+        config.write(f"baris={geometry.rows}\n")
+        config.write(f"kolom={geometry.cols}\n")
+        config.write(f"box={geometry.box_size}\n")
+        config.write(f"kartu_per_screenshot={geometry.per_capture}\n")
+        config.write(f"jarak_x={geometry.jarak_x}\n")
+        config.write(f"jarak_y={geometry.jarak_y}\n")
+        config.write(f"threshold={geometry.threshold}\n")
@@ -0,0 +1,421 @@
+import argparse
+import configparser
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+import cv2
+import numpy as np
+
+from board_layout import COLS, DEFAULT_GEOMETRY, ROWS, BoardGeometry, build_border
+
+# Kalibrasi: cari grid kartu di screenshot dengan template matching kasar-ke-halus terhadap gambar belakang kartu.
+# Tahap kasar di piramida (resolusi 1/scale) mencari kandidat kartu tertutup, grid diperkirakan dari kandidat itu,
+# lalu tiap sel dicocokkan ulang di resolusi penuh hanya di area kecil sekitar perkiraan.
+# Tahap kasar memakai beberapa versi template yang digeser (fase sub-sampling), jadi skornya hampir tidak
+# bergantung pada posisi papan modulo scale.
+# Gambar belakang kartu tidak dibawa aplikasi: tanpa template, gambar itu diambil dari screenshot sendiri
+# (median sel-sel papan yang berulang dengan jarak [papan]).
+
+TEMPLATE_FILE = "card_back.png"
+# Skala template yang dicoba di tahap kasar (DPI Windows / resolusi game berbeda dengan saat template diambil)
+TEMPLATE_SCALES = (1.0, 0.9, 1.1, 1.25, 0.8, 1.5)
+# Rentang skala jarak [papan] yang dicari saat template diambil dari screenshot
+PERIOD_SCALES = np.arange(0.75, 1.6, 1 / 64)
+
+Calibration = namedtuple("Calibration", ["positions", "spacing", "matched", "box_size"])
+
+class BoardNotFound(Exception):
+    pass
+
+def to_gray(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+def find_peaks(response, threshold, distance):
+    # Non-maximum suppression sederhana: ambil puncak tertinggi lalu kosongkan sekitarnya
+    response = response.copy()
+    peaks = []
+    while True:
+        _, score, _, (x, y) = cv2.minMaxLoc(response)
+        if score < threshold:
+            break
+        peaks.append((x, y, score))
+        response[max(0, y - distance):y + distance + 1, max(0, x - distance):x + distance + 1] = -1
+    return peaks
+
+def axis_spacing(values, other, tolerance):
+    # Jarak antar kolom (atau baris): selisih terkecil antar titik yang berada di baris (kolom) yang sama
+    gaps = []
+    for i in range(len(values)):
+        same = [values[j] - values[i] for j in range(len(values)) if j != i and abs(other[j] - other[i]) <= tolerance and values[j] > values[i] + tolerance]
+        if same:
+            gaps.append(min(same))
+    return float(np.median(gaps)) if gaps else None
+
+def lattice_inliers(xs, ys, sx, sy, rows, cols, tolerance=0.2):
+    # Titik yang jatuh di kisi yang sama (dengan titik jangkar terbaik) dan di dalam satu papan rows x cols
+    # dianggap kartu; sisanya false positive
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    best = None
+    for anchor in range(len(xs)):
+        dc = (xs - xs[anchor]) / sx
+        dr = (ys - ys[anchor]) / sy
+        c = np.round(dc).astype(int)
+        r = np.round(dr).astype(int)
+        on_grid = (np.abs(dc - c) < tolerance) & (np.abs(dr - r) < tolerance) & (np.abs(c) < cols) & (np.abs(r) < rows)
+        # Jendela papan (rows x cols sel, memuat jangkar) dengan titik terbanyak, dihitung dari integral image
+        counts = np.zeros((2 * rows, 2 * cols))
+        np.add.at(counts, (r[on_grid] + rows, c[on_grid] + cols), 1)
+        integral = counts.cumsum(0).cumsum(1)
+        windows = integral[rows:, cols:] - integral[:rows, cols:] - integral[rows:, :cols] + integral[:rows, :cols]
+        r0, c0 = np.unravel_index(np.argmax(windows), windows.shape)
+        inside = on_grid & (r > r0 - rows) & (r <= r0) & (c > c0 - cols) & (c <= c0)
+        if best is None or inside.sum() > best.sum():
+            best = inside
+    return np.flatnonzero(best)
+
+def fit_axis(values, spacing, count):
+    # Index kolom/baris tiap titik relatif ke titik terkecil
+    start = min(values)
+    index = np.round((np.asarray(values) - start) / spacing).astype(int)
+    if index.max() >= count:
+        raise BoardNotFound("grid lebih besar dari ukuran papan")
+    return index
+
+def fit_grid(points):
+    # Least squares x = x0 + c*sx, y = y0 + r*sy dari titik (c, r, x, y)
+    c, r, x, y = (np.asarray(values, dtype=np.float64) for values in zip(*points))
+    sx, x0 = np.polyfit(c, x, 1) if len(set(c)) > 1 else (0.0, x.mean())
+    sy, y0 = np.polyfit(r, y, 1) if len(set(r)) > 1 else (0.0, y.mean())
+    return x0, y0, sx, sy
+
+def shrink(img, scale):
+    return cv2.resize(img, (img.shape[1] // scale, img.shape[0] // scale), interpolation=cv2.INTER_AREA)
+
+def coarse_peaks(gray, template, scale, threshold):
+    # Template dipotong mulai (px, py) agar blok INTER_AREA-nya sejajar dengan blok screenshot untuk kartu
+    # yang x % scale == (-px) % scale. Fase tiap scale // 2 piksel sudah cukup (sisa geser <= 1 px di resolusi
+    # penuh, skor tetap > 0.95); respons diambil maksimum dari semua fase
+    box_h, box_w = template.shape
+    size_w = max(1, (box_w - scale) // scale) * scale
+    size_h = max(1, (box_h - scale) // scale) * scale
+    step = max(1, scale // 2)
+    phases = [(px, py) for py in range(0, scale, step) for px in range(0, scale, step)]
+    small = shrink(gray, scale)
+    response = best = None
+    for k, (px, py) in enumerate(phases):
+        result = cv2.matchTemplate(small, shrink(template[py:py + size_h, px:px + size_w], scale), cv2.TM_CCOEFF_NORMED)
+        if response is None:
+            response, best = result, np.zeros(result.shape, dtype=np.intp)
+        else:
+            better = result > response
+            response = np.where(better, result, response)
+            best[better] = k
+    peaks = find_peaks(response, threshold, max(2, min(size_w, size_h) // scale // 2))
+    points = []
+    for x, y, score in peaks:
+        px, py = phases[best[y, x]]
+        points.append((x * scale - px, y * scale - py, score))
+    return points
+
+def match_cell(gray, template, px, py, margin, threshold):
+    box_h, box_w = template.shape
+    x1, y1 = max(0, px - margin), max(0, py - margin)
+    roi = gray[y1:py + box_h + margin, x1:px + box_w + margin]
+    if roi.shape[0] < box_h or roi.shape[1] < box_w:
+        return None
+    result = cv2.matchTemplate(roi, template, cv2.TM_CCOEFF_NORMED)
+    _, score, _, (dx, dy) = cv2.minMaxLoc(result)
+    # Kartu yang sedang terbuka tidak cocok dengan template; posisinya diambil dari grid
+    return (x1 + dx, y1 + dy) if score >= threshold else None
+
+def coarse_grid(gray, template, rows, cols, scale, threshold):
+    # Perkiraan grid dari puncak tahap kasar: (total skor kartu di kisi, x, y, jarak x, jarak y)
+    peaks = coarse_peaks(gray, template, scale, threshold)
+    if len(peaks) < 3:
+        raise BoardNotFound(f"hanya {len(peaks)} kartu tertutup terdeteksi")
+
+    xs = [x for x, _, _ in peaks]
+    ys = [y for _, y, _ in peaks]
+    tolerance = scale * 2
+    sx = axis_spacing(xs, ys, tolerance)
+    sy = axis_spacing(ys, xs, tolerance)
+    if not sx or not sy:
+        raise BoardNotFound("jarak antar kartu tidak bisa ditentukan")
+    inliers = lattice_inliers(xs, ys, sx, sy, rows, cols)
+    score = sum(peaks[k][2] for k in inliers)
+    return score, [xs[k] for k in inliers], [ys[k] for k in inliers], sx, sy
+
+def resize_template(template, factor):
+    if factor == 1.0:
+        return template
+    box_h, box_w = template.shape[:2]
+    size = (max(1, int(round(box_w * factor))), max(1, int(round(box_h * factor))))
+    return cv2.resize(template, size, interpolation=cv2.INTER_AREA if factor < 1 else cv2.INTER_LINEAR)
+
+def locate_board(screenshot, template, rows=ROWS, cols=COLS, scale=4, threshold=0.7, refine=None, coarse_threshold=0.8, scales=(1.0,)):
+    gray = to_gray(screenshot)
+    template = to_gray(template)
+    height, width = gray.shape
+
+    # Tahap kasar punya threshold sendiri: dengan template sefase skor kartu tertutup ~1, sedangkan tepi jendela
+    # dan pola latar bisa mencapai ~0.75 di resolusi rendah. Dengan beberapa skala template, skala dengan total
+    # skor kartu di kisi terbesar yang dipakai (skala yang salah memberi lebih sedikit puncak dengan skor lebih rendah)
+    best = error = None
+    for factor in scales:
+        scaled = resize_template(template, factor)
+        try:
+            found = coarse_grid(gray, scaled, rows, cols, scale, coarse_threshold)
+        except BoardNotFound as e:
+            error = error or e
+            continue
+        if best is None or found[0] > best[0][0]:
+            best = (found, scaled)
+    if best is None:
+        raise error
+    (_, xs, ys, sx, sy), template = best
+    box_h, box_w = template.shape
+    col_index = fit_axis(xs, sx, cols)
+    row_index = fit_axis(ys, sy, rows)
+    x0, y0, sx, sy = fit_grid(list(zip(col_index, row_index, xs, ys)))
+
+    # Index kolom/baris di atas relatif ke kartu tertutup terkecil. Jika baris/kolom pertama seluruhnya terbuka
+    # (atau terlewat), grid bisa bergeser; karena itu semua pergeseran yang mungkin dicoba di resolusi penuh.
+    span_c = int(col_index.max())
+    span_r = int(row_index.max())
+    margin = refine if refine is not None else scale * 2
+    cells = {}
+
+    def cell(c, r):
+        if (c, r) not in cells:
+            px = int(round(x0 + c * sx))
+            py = int(round(y0 + r * sy))
+            inside = px >= 0 and py >= 0 and px + box_w <= width and py + box_h <= height
+            cells[(c, r)] = (inside, match_cell(gray, template, px, py, margin, threshold) if inside else None)
+        return cells[(c, r)]
+
+    # Tahap halus: cocokkan ulang tiap sel di resolusi penuh, hanya di sekitar posisi perkiraan
+    candidates = []
+    for shift_r in range(rows - span_r):
+        for shift_c in range(cols - span_c):
+            grid = [(c, r, *cell(c - shift_c, r - shift_r)) for r in range(rows) for c in range(cols)]
+            # Grid yang sebagian di luar screenshot tidak mungkin benar
+            if not all(inside for _, _, inside, _ in grid):
+                continue
+            refined = [(c, r, *match) for c, r, _, match in grid if match is not None]
+            candidates.append((len(refined), refined))
+    if not candidates:
+        raise BoardNotFound("grid kartu tidak muat di screenshot")
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    matched, refined = candidates[0]
+    if len(candidates) > 1 and candidates[1][0] == matched:
+        raise BoardNotFound("posisi grid ambigu (baris/kolom tepi seluruhnya terbuka?); tutup kartu lalu ulangi")
+    if matched < 3:
+        raise BoardNotFound("kartu tidak cocok di resolusi penuh")
+    x0, y0, sx, sy = fit_grid(refined)
+
+    # Grid akhir harus sesuai dengan semua kartu yang cocok dan seluruhnya berada di dalam screenshot
+    residual = max(max(abs(x0 + c * sx - x), abs(y0 + r * sy - y)) for c, r, x, y in refined)
+    if residual > scale:
+        raise BoardNotFound(f"kartu tidak membentuk grid teratur (selisih {residual:.1f} px)")
+    corners = [(x0, y0), (x0 + (cols - 1) * sx + box_w, y0 + (rows - 1) * sy + box_h)]
+    if any(x < -0.5 or y < -0.5 or x > width + 0.5 or y > height + 0.5 for x, y in corners):
+        raise BoardNotFound("grid hasil kalibrasi keluar dari screenshot")
+
+    positions = {}
+    no = 1
+    for r in range(rows):
+        for c in range(cols):
+            positions[no] = {"x": int(round(x0 + c * sx)), "y": int(round(y0 + r * sy))}
+            no += 1
+    return Calibration(positions, (sx, sy), len(refined), box_w)
+
+def periodic_evidence(small, sx, sy, vertical=True):
+    # Rata-rata lokal dari (selisih dengan piksel setengah jarak kartu) - (selisih dengan piksel satu jarak kartu).
+    # Papan kartu tertutup berulang persis per kartu, jadi nilainya besar; latar halus atau polos sama di semua
+    # pergeseran dan pola acak berbeda di semua pergeseran, jadi keduanya ~0
+    height, width = small.shape
+
+    def diff(dx, dy):
+        # Selisih terkecil dengan tetangga di kedua arah (geser sub-piksel), supaya kartu di tepi papan ikut terhitung
+        result = None
+        for sign in (1, -1):
+            shifted = cv2.warpAffine(small, np.float32([[1, 0, sign * dx], [0, 1, sign * dy]]), (width, height), borderMode=cv2.BORDER_REPLICATE)
+            delta = np.abs(small - shifted)
+            result = delta if result is None else np.minimum(result, delta)
+        return result
+
+    evidence = diff(sx / 2, 0) - diff(sx, 0)
+    if vertical:
+        evidence += diff(0, sy / 2) - diff(0, sy)
+    return cv2.blur(evidence, (max(1, int(sx)), max(1, int(sy))))
+
+def card_edge(profile, box_size):
+    # profile[i] = kekuatan tepi antara kolom i dan i+1. Tepi kiri dan kanan kartu membentang hampir setinggi sel,
+    # jadi pasangan tepi berjarak box_size yang keduanya kuat adalah batas kartu (garis hiasan di dalam kartu
+    # bisa lebih kontras, tetapi tidak punya pasangan di jarak itu). Di screenshot yang diskalakan tepi melebar
+    # 2-3 piksel, jadi profil yang dijumlah dengan tetangganya ikut dihitung
+    smooth = np.convolve(profile, np.ones(3), "same")
+    scores = [min(smooth[i - 1], smooth[i + box_size - 1]) + min(profile[i - 1], profile[i + box_size - 1])
+              for i in range(1, len(profile) - box_size + 1)]
+    best = int(np.argmax(scores))
+    return best + 1, scores[best]
+
+def median_cell(screenshot, x0, y0, sx, sy, size, rows, cols):
+    height, width = screenshot.shape[:2]
+    patches = []
+    for r in range(rows):
+        for c in range(cols):
+            x = int(round(x0 + c * sx))
+            y = int(round(y0 + r * sy))
+            if x >= 0 and y >= 0 and x + size <= width and y + size <= height:
+                patches.append(screenshot[y:y + size, x:x + size])
+    if len(patches) < 3:
+        raise BoardNotFound("papan terlalu dekat dengan tepi screenshot")
+    # Median membuang kartu yang sedang terbuka dan noise
+    return np.median(np.stack(patches), axis=0).astype(np.uint8)
+
+def derive_template(screenshot, geometry=DEFAULT_GEOMETRY, scale=4, evidence=12):
+    gray = to_gray(screenshot)
+    small = cv2.GaussianBlur(shrink(gray, scale).astype(np.float32), (3, 3), 0)
+
+    # Skala jarak kartu (DPI) dipilih yang bukti keberulangannya terbesar: dicari kasar dulu, lalu dihaluskan
+    # di sekitar skala terbaik. Arah horizontal saja sudah cukup untuk memilih skala, jadi pencarian memakai
+    # gambar yang dipadatkan lagi secara vertikal (tepi tegak kartu tetap utuh)
+    squeeze = 4
+    narrow = cv2.resize(small, (small.shape[1], max(1, small.shape[0] // squeeze)), interpolation=cv2.INTER_AREA)
+
+    def score(factor):
+        found = periodic_evidence(narrow, factor * geometry.jarak_x / scale, factor * geometry.jarak_y / scale / squeeze, vertical=False)
+        return float(np.maximum(found - evidence, 0).sum()), factor
+
+    step = PERIOD_SCALES[1] - PERIOD_SCALES[0]
+    best = max(score(factor) for factor in PERIOD_SCALES[::4])
+    best = max([best] + [score(best[1] + k * step) for k in (-2, -1, 1, 2)])
+    if best[0] <= 0:
+        raise BoardNotFound("pola kartu tertutup tidak ditemukan")
+    factor = best[1]
+    sx, sy = factor * geometry.jarak_x, factor * geometry.jarak_y
+    box_size = int(round(geometry.box_size * factor))
+
+    # Daerah berulang terbesar = papan. Tepinya melebar/menyempit sama besar di kedua sisi karena rata-rata lokal,
+    # jadi pojok kartu pertama diambil dari titik tengah daerah itu
+    board = (periodic_evidence(small, sx / scale, sy / scale) > evidence).astype(np.uint8)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(board)
+    if n < 2:
+        raise BoardNotFound("pola kartu tertutup tidak ditemukan")
+    k = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    left, top, board_w, board_h = (stats[k, key] * scale for key in (cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP, cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT))
+    grid_w = (geometry.cols - 1) * sx + box_size
+    grid_h = (geometry.rows - 1) * sy + box_size
+    if board_w < grid_w - 2 * sx or board_h < grid_h - 2 * sy:
+        raise BoardNotFound("pola kartu tertutup tidak ditemukan")
+
+    # Pojok dari tahap kasar bisa meleset (latar di sekitar papan ikut berulang); batas kartu dicari dari tepi
+    # pada median sel yang diperlebar setengah jarak kartu ke segala arah
+    margin = int(max(sx, sy) / 2)
+    x0 = int(round(left + board_w / 2 - grid_w / 2)) - margin
+    y0 = int(round(top + board_h / 2 - grid_h / 2)) - margin
+    cell = median_cell(screenshot, x0, y0, sx, sy, box_size + 2 * margin, geometry.rows, geometry.cols)
+    cell_gray = to_gray(cell).astype(np.float32)
+    cols_profile = np.median(np.abs(np.diff(cell_gray, axis=1)), axis=0)
+    rows_profile = np.median(np.abs(np.diff(cell_gray, axis=0)), axis=1)
+    # Ukuran kartu dari skala jarak bisa meleset 1 px; bila sama kuat, yang paling dekat perkiraan dipakai
+    estimate = geometry.box_size * factor
+    candidates = []
+    for size in (box_size - 1, box_size, box_size + 1):
+        left, score_x = card_edge(cols_profile, size)
+        top, score_y = card_edge(rows_profile, size)
+        candidates.append((score_x + score_y, -abs(size - estimate), size, left, top))
+    _, _, box_size, left, top = max(candidates)
+    return cell[top:top + box_size, left:left + box_size].copy()
+
+def calibrate(screenshot, geometry=DEFAULT_GEOMETRY, template=None, threshold=0.7):
+    # Tanpa template, gambar belakang kartu diambil dari screenshot ini (skalanya otomatis sama);
+    # template dari file dicoba di beberapa skala
+    if template is None:
+        return locate_board(screenshot, derive_template(screenshot, geometry), geometry.rows, geometry.cols, threshold=threshold)
+    return locate_board(screenshot, template, geometry.rows, geometry.cols, threshold=threshold, scales=TEMPLATE_SCALES)
+
+def calibrated_geometry(geometry, result):
+    # Ukuran kartu dan jarak hasil kalibrasi (berbeda dengan [papan] bila skala tampilan berubah)
+    sx, sy = result.spacing
+    return geometry._replace(box_size=result.box_size, jarak_x=int(round(sx)), jarak_y=int(round(sy)))
+
+def apply_calibration(config, border, geometry):
+    for section in ("border", "papan"):
+        if not config.has_section(section):
+            config.add_section(section)
+    for key, value in zip(("x1", "y1", "x2", "y2"), border):
+        config["border"][key] = str(value)
+    config["papan"]["box"] = str(geometry.box_size)
+    config["papan"]["jarak_x"] = str(geometry.jarak_x)
+    config["papan"]["jarak_y"] = str(geometry.jarak_y)
+
+def write_calibration(config_path, positions_path, positions, border, geometry):
+    with open(positions_path, "w") as f:
+        json.dump(positions, f, indent=2)
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    apply_calibration(config, border, geometry)
+    with open(config_path, "w") as f:
+        config.write(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cari posisi papan dari screenshot dan tulis positions.json + [border]")
+    parser.add_argument("screenshot")
+    parser.add_argument("-t", "--template", default=None, help=f"gambar belakang kartu (default: {TEMPLATE_FILE} bila ada, jika tidak diambil dari screenshot)")
+    parser.add_argument("-c", "--config", default="config.ini")
+    parser.add_argument("--learn", action="store_true", help="ambil gambar belakang kartu dari screenshot ini lalu simpan ke --template")
+    parser.add_argument("--write", action="store_true", help="tulis hasil ke positions.json dan config.ini")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args(argv)
+
+    screenshot = cv2.imread(args.screenshot)
+    if screenshot is None:
+        print(f"❌ Gagal membaca {args.screenshot}")
+        return 2
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    positions_path = config.get("json", "offset", fallback="positions.json")
+    geometry = BoardGeometry.from_config(config)
+
+    if args.learn:
+        path = args.template or TEMPLATE_FILE
+        try:
+            cv2.imwrite(path, derive_template(screenshot, geometry))
+        except BoardNotFound as e:
+            print(f"❌ Papan tidak ditemukan: {e}")
+            return 1
+        print(f"✅ Template disimpan ke {path}")
+        return 0
+
+    template = None
+    path = args.template or (TEMPLATE_FILE if os.path.exists(TEMPLATE_FILE) else None)
+    if path:
+        template = cv2.imread(path)
+        if template is None:
+            print(f"❌ Template tidak ditemukan: {path}")
+            return 2
+    start = time.perf_counter()
+    try:
+        result = calibrate(screenshot, geometry, template, args.threshold)
+    except BoardNotFound as e:
+        print(f"❌ Papan tidak ditemukan: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    positions = result.positions
+    geometry = calibrated_geometry(geometry, result)
+    border = build_border(positions, geometry.box_size)
+    print(f"✅ Papan ditemukan dalam {elapsed * 1000:.1f} ms: kartu 1 di ({positions[1]['x']}, {positions[1]['y']}), "
+          f"kotak {geometry.box_size} px, jarak {result.spacing[0]:.1f}x{result.spacing[1]:.1f}, "
+          f"{result.matched} kartu tertutup cocok, border {border}")
+    if args.write:
+        write_calibration(args.config, positions_path, positions, border, geometry)
+        print(f"💾 {positions_path}, [border] dan [papan] di {args.config} diperbarui")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
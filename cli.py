@@ -0,0 +1,128 @@
+import argparse
+import configparser
+import glob
+import json
+import os
+import sys
+import cv2
+
+# Hanya modul portabel: tidak ada tkinter/flet/win32, jadi bisa jalan di Linux dan start cepat
+from process_cards import ImageProcessor
+from image_utils import OverlayCompositor, create_overlay_images
+from frame_source import FolderSource, ReplaySource
+from board_locator import BoardNotFound, apply_calibration, calibrate, calibrated_geometry
+from board_layout import BoardGeometry, build_border, check_layout
+from file_utils import load_image_paths
+from stage_trace import StageTrace
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan crop → match → (render) tanpa GUI")
+    parser.add_argument("-c", "--config", default="config.ini", help="file config.ini")
+    parser.add_argument("-i", "--input", default=None, help="folder screenshot (default: [folder] input di config)")
+    parser.add_argument("-p", "--positions", default=None, help="positions.json (default: [json] offset di config)")
+    parser.add_argument("--replay", metavar="PATH", default=None, help="putar ulang rekaman (folder atau .zip) sebagai sumber frame")
+    parser.add_argument("--stream", action="store_true", help="rekaman berisi aliran frame: kartu diambil otomatis saat terdeteksi terbuka")
+    parser.add_argument("--rate", type=float, default=0.0, help="kecepatan replay (1 = waktu asli, 0 = secepat mungkin)")
+    parser.add_argument("--overlay", metavar="FOLDER", default=None, help="simpan PNG overlay ke folder ini")
+    parser.add_argument("--json", action="store_true", help="cetak hasil sebagai JSON")
+    parser.add_argument("--threshold", type=float, default=None, help="default: [papan] threshold di config")
+    parser.add_argument("--metric", choices=("absdiff", "ncc"), default="absdiff")
+    parser.add_argument("--candidates", choices=("auto", "all", "hash", "coarse"), default="auto")
+    parser.add_argument("--calibrate", metavar="TEMPLATE", nargs="?", const="", default=None,
+                        help="cari posisi papan dari screenshot pertama (TEMPLATE = gambar belakang kartu; tanpa TEMPLATE diambil dari screenshot)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker ImageProcessor (default: dari config)")
+    args = parser.parse_args(argv)
+
+    config = configparser.ConfigParser()
+    if not config.read(args.config):
+        print(f"❌ Config tidak ditemukan: {args.config}", file=sys.stderr)
+        return 2
+
+    with StageTrace(memory=False) as trace:
+        with trace.stage("config"):
+            with open(args.positions or config['json']['offset'], "r", encoding="utf-8") as f:
+                offsets = json.load(f)
+            border = tuple(int(config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+            try:
+                geometry = BoardGeometry.from_config(config)
+            except ValueError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 2
+            process = ImageProcessor.from_config(config)
+            if args.input:
+                process.input_folder = args.input
+            if args.workers:
+                process.workers = max(1, args.workers)
+            process.trace = trace
+
+        if args.calibrate is not None:
+            with trace.stage("calibrate"):
+                template = cv2.imread(args.calibrate) if args.calibrate else None
+                first = next(iter(FolderSource(args.replay if args.replay and os.path.isdir(args.replay) else process.input_folder)), None)
+                if (args.calibrate and template is None) or first is None:
+                    print("❌ Template atau screenshot untuk kalibrasi tidak ditemukan", file=sys.stderr)
+                    return 2
+                try:
+                    result = calibrate(first[1], geometry, template)
+                except BoardNotFound as e:
+                    print(f"❌ Papan tidak ditemukan: {e}", file=sys.stderr)
+                    return 1
+                # Posisi hasil kalibrasi hanya dipakai untuk run ini (board_locator.py --write untuk menyimpan)
+                offsets = {str(index): coords for index, coords in result.positions.items()}
+                geometry = calibrated_geometry(geometry, result)
+                border = build_border(result.positions, geometry.box_size)
+                apply_calibration(config, border, geometry)
+                process.border = border
+                process.box_size = geometry.box_size
+
+        try:
+            check_layout(config, offsets)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+
+        with trace.stage("crop"):
+            if args.replay:
+                with ReplaySource(args.replay, args.rate) as source:
+                    if args.stream:
+                        process.process_stream(offsets, source)
+                    else:
+                        process.process_frames(offsets, source)
+            else:
+                process.process_cropping(offsets)
+        with trace.stage("match"):
+            matched_pairs = process.process_matching(args.threshold, metric=args.metric, candidates=args.candidates)
+
+        if args.overlay:
+            with trace.stage("overlay_render"):
+                screen_width = int(config['resolusi']['lebar'])
+                screen_height = int(config['resolusi']['tinggi'])
+                os.makedirs(args.overlay, exist_ok=True)
+                # Hanya overlay lama yang dihapus, file lain di folder tidak disentuh
+                for path in glob.glob(os.path.join(args.overlay, "pair_*.png")):
+                    os.remove(path)
+                compositor = OverlayCompositor(offsets, screen_width, screen_height, border, geometry.box_size)
+                create_overlay_images(matched_pairs, offsets, args.overlay, screen_width, screen_height, *border, geometry.box_size, compositor)
+
+    timings = {record["name"]: record["wall"] for record in trace.stages}
+    if args.json:
+        record = {
+            "cards": int(process.found.sum()),
+            "pairs": process.match_records(),
+            "timings": timings,
+        }
+        if args.overlay:
+            record["overlays"] = load_image_paths(args.overlay)
+        print(json.dumps(record, indent=2))
+    else:
+        print(f"Kartu terbaca: {int(process.found.sum())}/{len(process.found)}")
+        for n, pair in enumerate(process.match_records(), start=1):
+            first, second = pair["cards"]
+            print(f"{n:2d}. kartu {first:2d} ↔ {second:2d}  skor {pair['score']:.4f}  margin {pair['margin']:.4f}")
+        if args.overlay:
+            print(f"🖼️ {len(load_image_paths(args.overlay))} overlay disimpan di {args.overlay}")
+        print(f"⏱️ {trace.summary()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import numpy as np
+
+# Deteksi kartu terbuka dari aliran frame (mis. replay rekaman) tanpa screenshot manual.
+# Tiap frame hanya area slot kartu yang disentuh, itu pun versi sampling (tiap `step` piksel),
+# sehingga cukup ringan untuk 60 fps di satu core.
+
+FACE_DOWN = "tertutup"
+FLIPPING = "membalik"
+FACE_UP = "terbuka"
+
+class FlipDetector:
+    def __init__(self, offsets, box_size=52, step=4, down_threshold=20.0, motion_threshold=6.0, stable_frames=3, template=None):
+        entries = sorted((int(key), coords) for key, coords in offsets.items())
+        self.cards = [index for index, _ in entries]
+        self.box_size = box_size
+        self.step = step
+        self.down_threshold = down_threshold
+        self.motion_threshold = motion_threshold
+        self.stable_frames = stable_frames
+
+        # Index sampling untuk semua slot sekaligus: frame[ys, xs] -> (slot, h, w, 3)
+        grid = np.arange(step // 2, box_size, step)
+        xs = np.array([coords["x"] for _, coords in entries])
+        ys = np.array([coords["y"] for _, coords in entries])
+        self.ys = (ys[:, None] + grid[None, :])[:, :, None]
+        self.xs = (xs[:, None] + grid[None, :])[:, None, :]
+        self.origins = list(zip(xs.tolist(), ys.tolist()))
+
+        count = len(entries)
+        self.templates = None if template is None else np.repeat(self.sample_patch(template)[None], count, axis=0)
+        self.previous = None
+        self.states = [FACE_DOWN] * count
+        self.stable = np.zeros(count, dtype=np.int32)
+        self.emitted = np.zeros(count, dtype=bool)
+        self.frames = 0
+        self.skipped = 0
+
+    def sample_patch(self, patch):
+        grid = np.arange(self.step // 2, self.box_size, self.step)
+        return patch[grid][:, grid].astype(np.int16)
+
+    def sample(self, frame):
+        return frame[self.ys, self.xs].astype(np.int16)
+
+    def learn_templates(self, small):
+        # Di awal permainan hampir semua kartu tertutup: median antar slot = tampak belakang kartu
+        median = np.median(small, axis=0).astype(np.int16)
+        distance = np.abs(small - median).mean(axis=(1, 2, 3))
+        self.templates = np.where((distance < self.down_threshold)[:, None, None, None], small, median).astype(np.int16)
+
+    def crop(self, frame, slot):
+        x, y = self.origins[slot]
+        return frame[y:y+self.box_size, x:x+self.box_size].copy()
+
+    def update(self, frame):
+        # Mengembalikan list (nomor kartu, crop) untuk kartu yang baru stabil terbuka di frame ini;
+        # kartu yang sama bisa muncul lagi dengan crop yang lebih baru, penerima cukup menimpa crop lama
+        self.frames += 1
+        small = self.sample(frame)
+        if self.templates is None:
+            self.learn_templates(small)
+
+        # Gerakan diukur terhadap frame terakhir yang dievaluasi (bukan frame sebelumnya), jadi flip lambat
+        # yang tiap framenya hanya berubah sedikit tetap terakumulasi sampai melewati motion_threshold
+        if self.previous is not None:
+            motion = np.abs(small - self.previous).mean(axis=(1, 2, 3))
+            # Tidak ada yang bergerak dan tidak ada slot yang sedang menunggu stabil: frame dilewati
+            if motion.max() < self.motion_threshold and not any(state == FLIPPING for state in self.states):
+                self.skipped += 1
+                return []
+        else:
+            motion = np.zeros(len(self.cards))
+        self.previous = small
+
+        distance = np.abs(small - self.templates).mean(axis=(1, 2, 3))
+        events = []
+        for slot in range(len(self.cards)):
+            if distance[slot] < self.down_threshold:
+                self.states[slot] = FACE_DOWN
+                self.stable[slot] = 0
+                self.emitted[slot] = False
+            elif motion[slot] >= self.motion_threshold:
+                # Kartu terbuka yang berubah lagi (mis. fade yang belum selesai) dikirim ulang setelah stabil
+                self.states[slot] = FLIPPING
+                self.stable[slot] = 0
+                self.emitted[slot] = False
+            else:
+                self.stable[slot] += 1
+                if self.stable[slot] < self.stable_frames:
+                    self.states[slot] = FLIPPING
+                    continue
+                self.states[slot] = FACE_UP
+                # Satu crop per kejadian terbuka; dianggap kejadian baru setelah kartu tertutup lagi
+                if not self.emitted[slot]:
+                    self.emitted[slot] = True
+                    events.append((self.cards[slot], self.crop(frame, slot)))
+        return events
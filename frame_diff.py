@@ -0,0 +1,90 @@
+import numpy as np
+
+# Rect dalam format (x, y, w, h), koordinat frame
+
+def overlaps(a, b):
+    return a[0] <= b[0] + b[2] and b[0] <= a[0] + a[2] and a[1] <= b[1] + b[3] and b[1] <= a[1] + a[3]
+
+def union_rect(a, b):
+    x1 = min(a[0], b[0])
+    y1 = min(a[1], b[1])
+    x2 = max(a[0] + a[2], b[0] + b[2])
+    y2 = max(a[1] + a[3], b[1] + b[3])
+    return (x1, y1, x2 - x1, y2 - y1)
+
+def merge_rects(rects):
+    # Gabungkan rect yang bersinggungan/tumpang tindih sampai tidak ada lagi yang bisa digabung
+    merged = [tuple(r) for r in rects if r[2] > 0 and r[3] > 0]
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for rect in merged:
+            for k, other in enumerate(result):
+                if overlaps(rect, other):
+                    result[k] = union_rect(rect, other)
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return sorted(merged)
+
+def bounding_rect(rects):
+    if not rects:
+        return None
+    box = rects[0]
+    for rect in rects[1:]:
+        box = union_rect(box, rect)
+    return box
+
+def clip_rect(rect, size):
+    width, height = size
+    x1 = max(0, rect[0])
+    y1 = max(0, rect[1])
+    x2 = min(width, rect[0] + rect[2])
+    y2 = min(height, rect[1] + rect[3])
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return (x1, y1, x2 - x1, y2 - y1)
+
+def diff_overlays(previous, current, size):
+    # Bandingkan dua deskripsi overlay; None berarti frame sebelumnya tidak diketahui
+    full = [(0, 0, size[0], size[1])]
+    if previous is None or current is None:
+        return full
+    if previous.border != current.border or previous.banner != current.banner:
+        return full
+
+    # Lubang yang ada di keduanya tidak berubah; sisanya (lubang lama tertutup, lubang baru terbuka) kotor
+    old_holes = set(previous.holes)
+    new_holes = set(current.holes)
+    changed = [clip_rect(rect, size) for rect in old_holes ^ new_holes]
+    return merge_rects([rect for rect in changed if rect])
+
+def diff_buffers(previous, current, tile=16):
+    # Versi berbasis piksel: bandingkan per tile lalu gabungkan tile yang berubah
+    if previous is None or previous.shape != current.shape:
+        return [(0, 0, current.shape[1], current.shape[0])]
+    height, width = current.shape[:2]
+    rows = -(-height // tile)
+    cols = -(-width // tile)
+    changed = np.any(previous != current, axis=-1) if current.ndim == 3 else previous != current
+    padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+    padded[:height, :width] = changed
+    tiles = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+    rects = []
+    for r in range(rows):
+        c = 0
+        while c < cols:
+            if not tiles[r, c]:
+                c += 1
+                continue
+            start = c
+            while c < cols and tiles[r, c]:
+                c += 1
+            rect = clip_rect((start * tile, r * tile, (c - start) * tile, tile), (width, height))
+            if rect:
+                rects.append(rect)
+    return merge_rects(rects)
@@ -0,0 +1,137 @@
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cv2
+import numpy as np
+
+# Sumber frame: iterator (timestamp, ndarray BGR layar penuh). Frame ke-k dipakai untuk kartu yang sama dengan
+# Screenshot_(k+1).png ([papan] kartu_per_screenshot), jadi ImageProcessor tidak perlu tahu asal frame.
+# Sumber berbasis file mengambil nomor slot dari nama file (indexed), supaya file yang hilang tidak menggeser kartu.
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+def screenshot_number(name):
+    match = re.search(r"(\d+)(?!.*\d)", os.path.basename(name))
+    return (0, int(match.group(1)), name) if match else (1, 0, name)
+
+def sorted_images(names):
+    return sorted((name for name in names if name.lower().endswith(IMAGE_EXTENSIONS)), key=screenshot_number)
+
+def slot_of(name, position):
+    numbered, number, _ = screenshot_number(name)
+    return number - 1 if numbered == 0 and number > 0 else position
+
+class FrameSource:
+    # Subclass cukup mengimplementasikan salah satu: __iter__ atau indexed
+    def __iter__(self):
+        for _, timestamp, frame in self.indexed():
+            yield timestamp, frame
+
+    def indexed(self):
+        # (slot, timestamp, frame); default: slot = urutan frame
+        for slot, (timestamp, frame) in enumerate(self):
+            yield slot, timestamp, frame
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class FolderSource(FrameSource):
+    # Mode lama: screenshot yang sudah ada di folder, timestamp = mtime file
+    def __init__(self, folder, workers=1):
+        self.folder = folder
+        self.workers = max(1, workers)
+
+    def names(self):
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted_images(os.listdir(self.folder))
+
+    def read(self, name):
+        path = os.path.join(self.folder, name)
+        img = cv2.imread(path)
+        if img is None:
+            print(f"⚠️ Gagal membaca {path}")
+            return None
+        return os.stat(path).st_mtime, img
+
+    def indexed(self):
+        names = self.names()
+        if self.workers <= 1:
+            for position, name in enumerate(names):
+                frame = self.read(name)
+                if frame is not None:
+                    yield (slot_of(name, position), *frame)
+            return
+
+        # Decode beberapa file di depan secara paralel, tapi frame tetap keluar berurutan
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for position, name in enumerate(names):
+                pending.append((slot_of(name, position), pool.submit(self.read, name)))
+                if len(pending) > self.workers:
+                    slot, future = pending.popleft()
+                    frame = future.result()
+                    if frame is not None:
+                        yield (slot, *frame)
+            while pending:
+                slot, future = pending.popleft()
+                frame = future.result()
+                if frame is not None:
+                    yield (slot, *frame)
+
+class ReplaySource(FrameSource):
+    # Putar ulang rekaman (folder atau .zip) dengan jarak antar frame seperti aslinya dibagi `rate`.
+    # rate <= 0 berarti secepat mungkin; `interval` memaksa jarak tetap (detik) antar frame.
+    def __init__(self, path, rate=1.0, interval=None):
+        self.path = path
+        self.rate = rate
+        self.interval = interval
+        self.archive = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def entries(self):
+        if self.archive is not None:
+            infos = {info.filename: info for info in self.archive.infolist() if not info.is_dir()}
+            return [(name, datetime(*infos[name].date_time).timestamp()) for name in sorted_images(infos)]
+        return [(name, os.stat(os.path.join(self.path, name)).st_mtime) for name in sorted_images(os.listdir(self.path))]
+
+    def read(self, name):
+        if self.archive is not None:
+            data = np.frombuffer(self.archive.read(name), dtype=np.uint8)
+            return cv2.imdecode(data, cv2.IMREAD_COLOR)
+        return cv2.imread(os.path.join(self.path, name))
+
+    def indexed(self):
+        entries = self.entries()
+        if not entries:
+            return
+        first = entries[0][1]
+        start = time.monotonic()
+        offset = 0.0
+        for k, (name, recorded) in enumerate(entries):
+            # Waktu rekaman bisa tidak urut (file disalin ulang); jangan pernah mundur
+            offset = k * self.interval if self.interval is not None else max(offset, recorded - first)
+            if self.rate and self.rate > 0:
+                delay = start + offset / self.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            img = self.read(name)
+            if img is None:
+                print(f"⚠️ Gagal membaca {name}")
+                continue
+            yield slot_of(name, k), offset, img
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
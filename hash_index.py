@@ -0,0 +1,60 @@
+from itertools import combinations
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+class HashIndex:
+    # Multi-index hashing: hash 64 bit dipecah jadi beberapa potongan, tiap potongan punya tabel sendiri
+    def __init__(self, bits=64, chunks=8):
+        self.bits = bits
+        self.chunks = chunks
+        self.chunk_bits = bits // chunks
+        self.mask = (1 << self.chunk_bits) - 1
+        self.tables = [{} for _ in range(chunks)]
+        self.hashes = []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _chunk(self, value, c):
+        return (value >> (c * self.chunk_bits)) & self.mask
+
+    def _variants(self, key, flips):
+        yield key
+        for count in range(1, flips + 1):
+            for positions in combinations(range(self.chunk_bits), count):
+                variant = key
+                for bit in positions:
+                    variant ^= 1 << bit
+                yield variant
+
+    def add(self, value):
+        item = len(self.hashes)
+        self.hashes.append(value)
+        for c, table in enumerate(self.tables):
+            table.setdefault(self._chunk(value, c), []).append(item)
+        return item
+
+    def query(self, value, radius):
+        # Pigeonhole: jarak <= radius berarti minimal satu potongan berbeda <= radius // chunks bit
+        flips = radius // self.chunks
+        candidates = set()
+        for c, table in enumerate(self.tables):
+            for key in self._variants(self._chunk(value, c), flips):
+                candidates.update(table.get(key, ()))
+
+        results = []
+        for item in candidates:
+            distance = hamming(value, self.hashes[item])
+            if distance <= radius:
+                results.append((distance, item))
+        results.sort()
+        return results
+
+    def candidate_pairs(self, radius):
+        pairs = set()
+        for item, value in enumerate(self.hashes):
+            for _, other in self.query(value, radius):
+                if other != item:
+                    pairs.add((min(item, other), max(item, other)))
+        return sorted(pairs)
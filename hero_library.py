@@ -0,0 +1,109 @@
+import os
+import numpy as np
+from image_utils import compute_descriptors
+from matching import MatchedPair, match_pairs
+
+class HeroLibrary:
+    def __init__(self, path, threshold=0.9, size=32):
+        self.path = path
+        self.threshold = threshold
+        self.size = size
+        self.pending = []
+        self.descriptors = self._open()
+
+    def _open(self):
+        if os.path.exists(self.path):
+            # Dibuka sebagai memory-map, isi file baru dibaca saat dipakai
+            return np.load(self.path, mmap_mode="r")
+        return np.zeros((0, self.size * self.size), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.descriptors) + len(self.pending)
+
+    @staticmethod
+    def normalize(descriptors):
+        centered = descriptors - descriptors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (centered / norms).astype(np.float32)
+
+    def _similarities(self, unit):
+        rows = [np.asarray(self.descriptors)] + ([np.stack(self.pending)] if self.pending else [])
+        library = np.concatenate(rows) if len(self) else np.zeros((0, unit.shape[1]), dtype=np.float32)
+        return unit @ library.T
+
+    def add(self, unit_descriptor):
+        self.pending.append(np.asarray(unit_descriptor, dtype=np.float32))
+        return len(self) - 1
+
+    def identify(self, crops, learn=True):
+        unit = self.normalize(compute_descriptors(crops, self.size))
+        sims = self._similarities(unit)
+        ids = np.full(len(unit), -1, dtype=np.intp)
+        best = np.zeros(len(unit), dtype=np.float32)
+        second = np.zeros(len(unit), dtype=np.float32)
+
+        if sims.shape[1]:
+            ids = sims.argmax(axis=1)
+            best = sims[np.arange(len(unit)), ids]
+            if sims.shape[1] > 1:
+                second = np.partition(sims, -2, axis=1)[:, -2]
+            ids[best < self.threshold] = -1
+
+        # Wajah baru: cocokkan dulu dengan wajah baru lain di sesi ini, kalau tidak ada tambahkan ke library
+        start = len(self)
+        for n in np.flatnonzero(ids < 0):
+            if self.pending and len(self) > start:
+                fresh = np.stack(self.pending[start - len(self.descriptors):]) @ unit[n]
+                k = int(fresh.argmax())
+                if fresh[k] >= self.threshold:
+                    ids[n] = start + k
+                    best[n] = fresh[k]
+                    continue
+            if learn:
+                ids[n] = self.add(unit[n])
+                best[n] = 1.0
+
+        return ids, best - second, unit
+
+    def match(self, crops, threshold=None):
+        ids, margins, unit = self.identify(crops)
+
+        groups = {}
+        for n, hero in enumerate(ids):
+            if hero >= 0:
+                groups.setdefault(int(hero), []).append(n)
+
+        pairs = []
+        leftover = [n for n, hero in enumerate(ids) if hero < 0]
+        for members in groups.values():
+            if len(members) == 2:
+                i, j = members
+                score = float(unit[i] @ unit[j])
+                if threshold is None or score > threshold:
+                    pairs.append(MatchedPair(i, j, score, float(min(margins[i], margins[j]))))
+                    continue
+            leftover.extend(members)
+
+        # Kartu yang ID-nya tidak membentuk pasangan tepat dua dicocokkan langsung satu sama lain
+        if len(leftover) > 1:
+            leftover.sort()
+            sub = unit[leftover]
+            for pair in match_pairs(sub @ sub.T, threshold):
+                pairs.append(MatchedPair(leftover[pair.first], leftover[pair.second], pair.score, pair.margin))
+
+        pairs.sort()
+        return pairs
+
+    def save(self):
+        if not self.pending:
+            return
+        data = np.concatenate([np.asarray(self.descriptors), np.stack(self.pending)])
+        # Lepas memory-map dulu agar file bisa diganti (Windows mengunci file yang sedang di-map)
+        self.descriptors = data
+        self.pending = []
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp_path, self.path)
+        self.descriptors = self._open()
@@ -2,13 +2,32 @@ import cv2
 import numpy as np
 import os
 import math
+from collections import namedtuple
 from PIL import Image, ImageDraw, ImageFont
 
+BANNER_TEXT = "Alt + Z: Prev | Alt + X: Next"
+
+# Deskripsi overlay: rect papan, rect lubang kartu, dan teks banner. Piksel baru dibuat saat ditampilkan.
+OverlayFrame = namedtuple("OverlayFrame", ["border", "holes", "banner"])
+
 def make_transparent(canvas, x, y, box_size=52):
     canvas[y:y+box_size, x:x+box_size, 3] = 0
 
-def get_input_filename(index: int) -> str:
-    return f"Screenshot_{math.ceil(index / 2)}.png"
+def get_input_filename(index: int, per_capture: int = 2) -> str:
+    return f"Screenshot_{math.ceil(index / per_capture)}.png"
+
+def crop_board(img, border=None):
+    if img is None or border is None:
+        return img
+    x1, y1, x2, y2 = border
+    return img[y1:y2, x1:x2]
+
+def load_board_region(path, border=None):
+    img = cv2.imread(path)
+    if img is None or border is None:
+        return img
+    # Simpan hanya area papan, frame penuh langsung dilepas
+    return crop_board(img, border).copy()
 
 def compare_images(img1, img2):
     img1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
@@ -18,37 +37,168 @@ def compare_images(img1, img2):
     diff = cv2.absdiff(img1, img2)
     return 1 - (np.sum(diff) / (100*100*255))
 
-def create_overlay_images(matched_pairs, offsets, output_folder, screen_width, screen_height, mkx1, mky1, mkx2, mky2, box_size=52):
+def compute_descriptors(crops, size=100):
+    descriptors = np.empty((len(crops), size * size), dtype=np.float32)
+    for n, crop in enumerate(crops):
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        descriptors[n] = cv2.resize(gray, (size, size)).ravel()
+    return descriptors
+
+def pool_descriptors(descriptors, factor=5):
+    # Versi kasar descriptor (rata-rata blok factor x factor) untuk memilih kandidat di papan besar
+    n, dim = descriptors.shape
+    size = int(round(math.sqrt(dim)))
+    cells = size // factor
+    blocks = descriptors.reshape(n, size, size)[:, :cells * factor, :cells * factor]
+    return blocks.reshape(n, cells, factor, cells, factor).mean(axis=(2, 4)).reshape(n, cells * cells)
+
+def similarity_matrix(descriptors, metric="absdiff"):
+    n, dim = descriptors.shape
+    if metric == "absdiff":
+        # Skor sama dengan compare_images: 1 - mean|a-b| / 255
+        values = descriptors.astype(np.int16)
+        scores = np.empty((n, n), dtype=np.float32)
+        chunk = max(1, 1_000_000 // max(1, n * dim))
+        for start in range(0, n, chunk):
+            block = values[start:start+chunk]
+            diff = np.abs(block[:, None, :] - values[None, :, :]).sum(axis=2, dtype=np.int32)
+            scores[start:start+chunk] = 1 - diff / (dim * 255)
+        return scores
+    if metric == "ncc":
+        centered = descriptors - descriptors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        unit = centered / norms
+        return unit @ unit.T
+    raise ValueError(f"Metric tidak dikenal: {metric}")
+
+def pair_scores(descriptors, pairs, metric="absdiff"):
+    if not len(pairs):
+        return np.zeros(0, dtype=np.float32)
+    first, second = np.asarray(pairs, dtype=np.intp).T
+    if metric == "absdiff":
+        values = descriptors.astype(np.int16)
+        diff = np.abs(values[first] - values[second]).sum(axis=1, dtype=np.int32)
+        return 1 - diff / (descriptors.shape[1] * 255)
+    if metric == "ncc":
+        centered = descriptors - descriptors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1)
+        norms[norms == 0] = 1
+        return (centered[first] * centered[second]).sum(axis=1) / (norms[first] * norms[second])
+    raise ValueError(f"Metric tidak dikenal: {metric}")
+
+def dhash(img, hash_size=8):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def compute_hashes(crops, hash_size=8):
+    return [dhash(crop, hash_size) for crop in crops]
+
+def load_font():
     try:
-        font = ImageFont.truetype("arial.ttf", 28)
+        return ImageFont.truetype("arial.ttf", 28)
     except:
-        font = ImageFont.load_default()
-    for idx, (a, b) in enumerate(matched_pairs, start=0):
-        canvas = np.zeros((screen_height, screen_width, 4), dtype=np.uint8)
+        return ImageFont.load_default()
+
+class OverlayCompositor:
+    # Papan gelap dan banner dirender sekali ke base frame; tiap pasangan hanya melubangi dua kotak.
+    # Semua koordinat lokal terhadap surface seukuran papan + strip banner, bukan satu layar penuh.
+    def __init__(self, offsets, screen_width, screen_height, border, box_size=52, font=None):
+        self.offsets = offsets
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.border = border
+        self.box_size = box_size
+        self.font = font or load_font()
+        self.padding = 10
+        self._layout()
+        self.base = self._build_base()
+        self.base_bgra = to_premultiplied_bgra(self.base)
+
+    def _layout(self):
+        mkx1, mky1, mkx2, mky2 = self.border
+        draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        text_bbox = draw.textbbox((0, 0), BANNER_TEXT, font=self.font)
+        self.text_w = text_bbox[2] - text_bbox[0]
+        self.text_h = text_bbox[3] - text_bbox[1]
+        banner_w = self.text_w + 2 * self.padding
+        banner_h = self.text_h + 2 * self.padding
+
+        self.width = max(mkx2 - mkx1, banner_w)
+        x = mkx1 - (self.width - (mkx2 - mkx1)) // 2
+        x = min(max(0, x), max(0, self.screen_width - self.width))
+        y = max(0, mky1 - banner_h)
+        self.origin = (x, y)
+        self.height = mky2 - y
+        self.local_border = (mkx1 - x, mky1 - y, mkx2 - x, mky2 - y)
+
+    def _build_base(self):
+        mkx1, mky1, mkx2, mky2 = self.local_border
+        canvas = np.zeros((self.height, self.width, 4), dtype=np.uint8)
         canvas[mky1:mky2, mkx1:mkx2, 0:3] = 0
         canvas[mky1:mky2, mkx1:mkx2, 3] = int(255 * 0.50)
-        for card in [a+1, b+1]:
-            pos = offsets.get(str(card))
-            if pos:
-                make_transparent(canvas, pos["x"], pos["y"], box_size)
-        text = "Alt + Z: Prev | Alt + X: Next"
         pil_img = Image.fromarray(canvas)
         draw = ImageDraw.Draw(pil_img)
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_w = text_bbox[2] - text_bbox[0]
-        text_h = text_bbox[3] - text_bbox[1]
-        x = (screen_width - text_w) // 2
-        y = 10
-        padding = 10
+        padding = self.padding
+        x = (self.width - self.text_w) // 2
+        y = padding
         rect_x1 = x - padding
         rect_y1 = y - padding
-        rect_x2 = x + text_w + padding
-        rect_y2 = y + text_h + padding
+        rect_x2 = x + self.text_w + padding
+        rect_y2 = y + self.text_h + padding
         draw.rectangle(
             [rect_x1, rect_y1, rect_x2, rect_y2],
             fill=(0, 0, 0, 180)
         )
-        draw.text((x, y), text, font=font, fill=(255, 255, 0, 255))
+        draw.text((x, y), BANNER_TEXT, font=self.font, fill=(255, 255, 0, 255))
+        return np.array(pil_img)
+
+    def describe(self, pair):
+        a, b = pair[0], pair[1]
+        origin_x, origin_y = self.origin
+        holes = []
+        for card in [a+1, b+1]:
+            pos = self.offsets.get(str(card))
+            if pos:
+                holes.append((pos["x"] - origin_x, pos["y"] - origin_y, self.box_size, self.box_size))
+        return OverlayFrame(self.local_border, tuple(holes), BANNER_TEXT)
+
+    def patch(self, frame, overlay, previous=None, base=None):
+        # Kembalikan lubang overlay sebelumnya dari base, lalu buka lubang overlay baru
+        base = self.base_bgra if base is None else base
+        if previous is not None:
+            for x, y, w, h in previous.holes:
+                frame[y:y+h, x:x+w] = base[y:y+h, x:x+w]
+        for x, y, w, h in overlay.holes:
+            # Lubang dikosongkan di semua channel agar tetap valid sebagai premultiplied alpha
+            frame[y:y+h, x:x+w] = 0
+        return frame
+
+    def rasterize(self, overlay):
+        return self.patch(self.base_bgra.copy(), overlay)
+
+    def render_image(self, pair):
+        frame = self.patch(self.base.copy(), self.describe(pair), base=self.base)
+        return Image.fromarray(frame)
+
+def to_premultiplied_bgra(rgba):
+    # Format yang diharapkan UpdateLayeredWindow dengan AlphaFormat=1 (AC_SRC_ALPHA)
+    alpha = rgba[..., 3:4].astype(np.uint16)
+    bgra = np.empty_like(rgba)
+    bgra[..., 0:3] = ((rgba[..., 2::-1].astype(np.uint16) * alpha + 127) // 255).astype(np.uint8)
+    bgra[..., 3] = rgba[..., 3]
+    return bgra
+
+def create_overlay_images(matched_pairs, offsets, output_folder, screen_width, screen_height, mkx1, mky1, mkx2, mky2, box_size=52, compositor=None):
+    compositor = compositor or OverlayCompositor(offsets, screen_width, screen_height, (mkx1, mky1, mkx2, mky2), box_size)
+    overlays = []
+    for idx, (a, b) in enumerate(matched_pairs, start=0):
+        overlays.append(compositor.describe((a, b)))
 
-        path = os.path.join(output_folder, f"pair_{idx+1}.png")
-        pil_img.save(path, "PNG")
+        # Simpan PNG hanya jika diminta (export/debug)
+        if output_folder:
+            path = os.path.join(output_folder, f"pair_{idx+1}.png")
+            compositor.render_image((a, b)).save(path, "PNG")
+    return overlays
@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+
+class ScreenshotWatcher(threading.Thread):
+    def __init__(self, processor, offsets, interval=0.2, settle=0.3, on_ingest=None):
+        super().__init__(daemon=True)
+        self.processor = processor
+        self.interval = interval
+        self.settle = settle
+        self.on_ingest = on_ingest
+        self.running = True
+        self.seen = {}
+        self.processor.prepare(offsets)
+
+    def poll(self):
+        folder = self.processor.input_folder
+        if not os.path.isdir(folder):
+            return
+        now = time.monotonic()
+        for name in os.listdir(folder):
+            if name not in self.processor.files:
+                continue
+            try:
+                stat = os.stat(os.path.join(folder, name))
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if stat.st_size == 0 or self.processor.ingested.get(name) == signature:
+                continue
+
+            # Debounce: file baru diproses setelah ukuran dan mtime tidak berubah selama `settle` detik
+            previous = self.seen.get(name)
+            if previous is None or previous[0] != signature:
+                self.seen[name] = (signature, now)
+                continue
+            if now - previous[1] < self.settle:
+                continue
+
+            if self.processor.ingest_screenshot(name) and self.on_ingest:
+                self.on_ingest(name)
+
+    def run(self):
+        while self.running:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Watcher error: {e}")
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
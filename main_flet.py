@@ -1,265 +1,19 @@
+# Dipasang paling awal agar waktu import GUI ikut tercatat di laporan startup
+from startup import PIPELINE_MODULES, StartupReport
+startup = StartupReport()
+
 import flet as ft
 from datetime import datetime
 import os
 import shutil
 import sys
 import ctypes
-from ctypes import wintypes
-import win32con
-import win32gui
-import win32api
 import json
 import configparser
-from PIL import Image, ImageDraw, ImageFont
 import time
-import threading
 from functools import partial
 
-from file_utils import clear_folder
-from process_cards import ImageProcessor
-from image_utils import create_overlay_images
-
-# ===============================
-# OVERLAY WORKER
-# ===============================
-class BITMAPINFOHEADER(ctypes.Structure):
-    _fields_ = [
-        ("biSize", wintypes.DWORD),
-        ("biWidth", wintypes.LONG),
-        ("biHeight", wintypes.LONG),
-        ("biPlanes", wintypes.WORD),
-        ("biBitCount", wintypes.WORD),
-        ("biCompression", wintypes.DWORD),
-        ("biSizeImage", wintypes.DWORD),
-        ("biXPelsPerMeter", wintypes.LONG),
-        ("biYPelsPerMeter", wintypes.LONG),
-        ("biClrUsed", wintypes.DWORD),
-        ("biClrImportant", wintypes.DWORD),
-    ]
-
-class BITMAPINFO(ctypes.Structure):
-    _fields_ = [
-        ("bmiHeader", BITMAPINFOHEADER),
-        ("bmiColors", wintypes.DWORD * 1)
-    ]
-
-class OverlayWorker(threading.Thread):
-    HOTKEY_PREV_ID = 1
-    HOTKEY_NEXT_ID = 2
-    MOD_ALT = 0x0001
-    VK_Z = 0x5A
-    VK_X = 0x58
-
-    def __init__(self, config, add_log, on_finish=None):
-        super().__init__(daemon=True)
-        self.config = config
-        self.add_log = add_log
-        self.on_finish = on_finish
-        self.running = True
-        self.hwnd_main = None
-        self.cur_index = 0
-        self.pil_cache = []
-        self.image_paths = []
-
-        self.user32 = ctypes.windll.user32
-        self.gdi32 = ctypes.windll.gdi32
-
-    def wnd_proc_factory(self):
-        def wnd_proc(hwnd, msg, wparam, lparam):
-            if msg == win32con.WM_DESTROY:
-                win32gui.PostQuitMessage(0)
-                return 0
-            elif msg == win32con.WM_HOTKEY:
-                hot_id = wparam & 0xffff
-                if hot_id == self.HOTKEY_NEXT_ID:
-                    self.show_next()
-                elif hot_id == self.HOTKEY_PREV_ID:
-                    self.show_prev()
-                return 0
-            return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
-        return wnd_proc
-
-    def create_layered_window(self, width, height):
-        hInstance = win32api.GetModuleHandle(None)
-        className = "OverlayWindow"
-
-        wndClass = win32gui.WNDCLASS()
-        wndClass.lpfnWndProc = self.wnd_proc_factory()
-        wndClass.hInstance = hInstance
-        wndClass.lpszClassName = className
-
-        try:
-            atom = win32gui.RegisterClass(wndClass)
-        except win32gui.error as e:
-            if e.winerror == 1410:
-                atom = className
-            else:
-                raise
-
-        exStyle = win32con.WS_EX_LAYERED | win32con.WS_EX_TOPMOST
-        style = win32con.WS_POPUP
-
-        hwnd = win32gui.CreateWindowEx(
-            exStyle, atom, "Overlay", style,
-            0, 0, width, height,
-            0, 0, hInstance, None
-        )
-
-        win32gui.ShowWindow(hwnd, win32con.SW_SHOW)
-        return hwnd
-
-
-    def create_dib_from_pil(self, pil_img):
-        if pil_img.mode != "RGBA":
-            pil_img = pil_img.convert("RGBA")
-        if pil_img.size != (self.screen_width, self.screen_height):
-            pil_img = pil_img.resize((self.screen_width, self.screen_height), Image.LANCZOS)
-
-        raw = pil_img.tobytes("raw", "BGRA")
-        width, height = pil_img.size
-        bmi = BITMAPINFO()  
-        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER) 
-        bmi.bmiHeader.biWidth = width
-        bmi.bmiHeader.biHeight = -height
-        bmi.bmiHeader.biPlanes = 1
-        bmi.bmiHeader.biBitCount = 32
-        bmi.bmiHeader.biCompression = win32con.BI_RGB
-        bmi.bmiHeader.biSizeImage = 0
-
-        hdc = self.user32.GetDC(0)
-        memdc = self.gdi32.CreateCompatibleDC(hdc)
-        ppvBits = ctypes.c_void_p()
-        hbitmap = self.gdi32.CreateDIBSection(memdc, ctypes.byref(bmi), win32con.DIB_RGB_COLORS, ctypes.byref(ppvBits), None, 0)
-        ctypes.memmove(ppvBits, raw, len(raw))
-        oldbmp = self.gdi32.SelectObject(memdc, hbitmap)
-        return hbitmap, memdc, hdc, oldbmp
-
-    def update_window_bitmap(self, hwnd, pil_image):
-        hbitmap, memdc, hdc_screen, oldbmp = self.create_dib_from_pil(pil_image)
-        class BLENDFUNCTION(ctypes.Structure):
-            _fields_ = [
-                ("BlendOp", ctypes.c_ubyte),
-                ("BlendFlags", ctypes.c_ubyte),
-                ("SourceConstantAlpha", ctypes.c_ubyte),
-                ("AlphaFormat", ctypes.c_ubyte)
-            ]
-        blend = BLENDFUNCTION()
-        blend.BlendOp = 0
-        blend.BlendFlags = 0
-        blend.SourceConstantAlpha = 255
-        blend.AlphaFormat = 1
-        screen_dc = self.user32.GetDC(0)
-        pt_src = wintypes.POINT(0, 0)
-        size = wintypes.SIZE(self.screen_width, self.screen_height)
-        pt_dest = wintypes.POINT(0, 0)
-        self.user32.UpdateLayeredWindow(hwnd, screen_dc, ctypes.byref(pt_dest), ctypes.byref(size),
-                                        memdc, ctypes.byref(pt_src), 0, ctypes.byref(blend), 0x02)
-        self.gdi32.SelectObject(memdc, oldbmp)
-        self.gdi32.DeleteObject(hbitmap)
-        self.gdi32.DeleteDC(memdc)
-        self.user32.ReleaseDC(0, screen_dc)
-
-    def show_index(self, i):
-        if not self.pil_cache:
-            return
-        self.cur_index = i % len(self.pil_cache)
-        self.update_window_bitmap(self.hwnd_main, self.pil_cache[self.cur_index])
-        self.add_log(f"📸 Menampilkan gambar {self.cur_index + 1}/{len(self.pil_cache)}")
-
-    def show_next(self):
-        self.show_index(self.cur_index + 1)
-
-    def show_prev(self):
-        self.show_index(self.cur_index - 1)
-
-    def register_hotkeys(self):
-        if not self.user32.RegisterHotKey(self.hwnd_main, self.HOTKEY_NEXT_ID, self.MOD_ALT, self.VK_X):
-            self.add_log("⚠️ Gagal register hotkey Alt+X")
-        else:
-            self.add_log("✅ Hotkey Alt+X aktif (Next)")
-        if not self.user32.RegisterHotKey(self.hwnd_main, self.HOTKEY_PREV_ID, self.MOD_ALT, self.VK_Z):
-            self.add_log("⚠️ Gagal register hotkey Alt+Z")
-        else:
-            self.add_log("✅ Hotkey Alt+Z aktif (Prev)")
-
-    def stop(self):
-        self.running = False
-        try:
-            self.user32.UnregisterHotKey(self.hwnd_main, self.HOTKEY_NEXT_ID)
-            self.user32.UnregisterHotKey(self.hwnd_main, self.HOTKEY_PREV_ID)
-            win32gui.PostQuitMessage(0)
-        except Exception:
-            pass
-        self.add_log("🛑 Overlay dihentikan dan hotkey dilepas.")
-
-    def cleanup(self):
-        try:
-            clear_folder(self.config['folder']['process'])
-            clear_folder(self.config['folder']['output'])
-        except Exception:
-            pass
-        self.add_log("🧹 Cleanup selesai.")
-    
-    def _load_offsets(self, json_file):
-        import json
-        with open(json_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    def run(self):
-        try:
-            input_folder = self.config['folder']['input']
-            process_folder = self.config['folder']['process']
-            output_folder = self.config['folder']['output']
-            screen_width = int(self.config['resolusi']['lebar'])
-            screen_height = int(self.config['resolusi']['tinggi'])
-            json_file = self.config['json']['offset']
-
-            process = ImageProcessor(input_folder, process_folder, 52)
-            self.add_log("Proses 1 : Cropping...")
-            process.process_cropping(self._load_offsets(json_file))
-            self.add_log("Proses 2 : Matching...")
-            matched_pairs = process.process_matching(0.9)
-            self.add_log("Proses 3 : Overlaying...")
-            create_overlay_images(
-                matched_pairs,
-                self._load_offsets(json_file),
-                output_folder,
-                screen_width,
-                screen_height,
-                int(self.config['border']['x1']),
-                int(self.config['border']['y1']),
-                int(self.config['border']['x2']),
-                int(self.config['border']['y2']),
-                52
-            )
-
-            self.screen_width = int(self.config['resolusi']['lebar'])
-            self.screen_height = int(self.config['resolusi']['tinggi'])
-            output_folder = self.config['folder']['output']
-
-            self.image_paths = sorted([os.path.join(output_folder, f) for f in os.listdir(output_folder) if f.lower().endswith(".png")])
-            for p in self.image_paths:
-                pil = Image.open(p).convert("RGBA")
-                self.pil_cache.append(pil)
-
-            if not self.pil_cache:
-                self.add_log("❌ Tidak ada gambar overlay ditemukan")
-                return
-
-            self.hwnd_main = self.create_layered_window(self.screen_width, self.screen_height)
-            self.register_hotkeys()
-            self.show_index(0)
-
-            while self.running:
-                win32gui.PumpWaitingMessages()
-                time.sleep(0.1)
-
-        except Exception as e:
-            self.add_log(f"❌ ERROR: {e}")
-        finally:
-            self.cleanup()
-            if self.on_finish:
-                self.on_finish()
+from board_layout import BoardGeometry, build_border, build_positions, check_layout, write_config
 
 is_running = False
 current_task = None
@@ -286,6 +40,7 @@ def main(page: ft.Page):
     button_erase = ft.IconButton(icon=ft.Icons.DELETE_FOREVER_ROUNDED, tooltip="Clear Logs")
 
     overlay_thread = {"worker": None}
+    watcher_thread = {"watcher": None, "prerender": None, "token": None}
 
     def switch_button(value: int):
         if value == 2:
@@ -434,6 +189,12 @@ def main(page: ft.Page):
                 add_log(f"❌ Nilai x/y untuk key '{key}' harus berupa angka.", color=ft.Colors.RED)
                 return False
 
+        try:
+            check_layout(config, data)
+        except ValueError as e:
+            add_log(f"❌ {e}", color=ft.Colors.RED)
+            return False
+
         add_log("✅ File JSON valid dan lengkap.", color=ft.Colors.GREEN)
 
         return True
@@ -447,6 +208,7 @@ def main(page: ft.Page):
                 status_text.color = ft.Colors.GREEN
                 refresh_button.bgcolor = ft.Colors.GREEN
                 switch_button(1)
+                start_watcher()
         else:
             status_text.value = "Status: Configuration File not Found"
             status_text.color = ft.Colors.RED
@@ -463,32 +225,17 @@ def main(page: ft.Page):
         return path_folder
 
     def create_config(config_path='config.ini'):
-        game_width = 800
-        game_height = 600
-        cols = 6
-        rows = 5
-        jarak_x = 64
-        jarak_y = 60
-
         user32 = ctypes.windll.user32
         screen_width = user32.GetSystemMetrics(0)
         screen_height = user32.GetSystemMetrics(1)
 
-        offset_x = (screen_width - game_width) // 2
-        offset_y = (screen_height - game_height) // 2 + 5
-
-        tikum_x = offset_x + 44
-        tikum_y = offset_y + 183
-
-        arr_x = [jarak_x * n + tikum_x for n in range(cols)]
-        arr_y = [jarak_y * n + tikum_y for n in range(rows)]
-
-        positions = {}
-        no = 1
-        for i in range(rows):
-            for j in range(cols):
-                positions[no] = {"x": arr_x[j], "y": arr_y[i]}
-                no += 1
+        # Geometri dari config.ini yang sudah ada (mis. [papan] diubah untuk event lain), default papan 6x5
+        try:
+            geometry = BoardGeometry.from_config(load_config(config_path))
+            positions = build_positions(screen_width, screen_height, geometry)
+        except ValueError as e:
+            add_log(f"❌ {e}", color=ft.Colors.RED)
+            return
 
         with open("positions.json", "w") as f:
             json.dump(positions, f, indent=2)
@@ -504,29 +251,7 @@ def main(page: ft.Page):
         if not output_path.endswith("\\"):
             output_path += "\\"
 
-        with open("config.ini", "w") as config:
-            config.write("[resolusi]\n")
-            config.write(f"lebar={screen_width}\n")
-            config.write(f"tinggi={screen_height}\n\n")
-
-            config.write("[json]\n")
-            config.write("offset=positions.json\n\n")
-
-            config.write("[folder]\n")
-            config.write(f"input={input_path}\n")
-            config.write(f"process={process_path}\n")
-            config.write(f"output={output_path}\n\n")
-
-            x1 = positions[1]["x"] - 14
-            y1 = positions[1]["y"] - 8
-            x2 = positions[30]["x"] + 66
-            y2 = positions[30]["y"] + 60
-
-            config.write("[border]\n")
-            config.write(f"x1={x1}\n")
-            config.write(f"y1={y1}\n")
-            config.write(f"x2={x2}\n")
-            config.write(f"y2={y2}\n")
+        write_config(config_path, screen_width, screen_height, input_path, process_path, output_path, build_border(positions, geometry.box_size), geometry=geometry)
 
         add_log("✅ File 'positions.json' dan 'config.ini' berhasil disimpan.", color=ft.Colors.YELLOW)
         add_log("Silahkan jalankan ulang program.", color=ft.Colors.YELLOW)
@@ -545,8 +270,14 @@ def main(page: ft.Page):
         if overlay_thread["worker"] and overlay_thread["worker"].is_alive():
             add_log("⚠️ Overlay sudah berjalan.")
             return
+        from overlay_worker import OverlayWorker
+        from win32_presenter import Win32Presenter
+
         config = load_config("config.ini")
-        worker = OverlayWorker(config, add_log, on_finish=lambda: switch_button(1))
+        watcher = watcher_thread["watcher"]
+        processor = watcher.processor if watcher and watcher.is_alive() else None
+        prerender = watcher_thread["prerender"] if processor else None
+        worker = OverlayWorker(config, add_log, on_finish=lambda: switch_button(1), processor=processor, prerender=prerender, presenter=Win32Presenter(), config_path="config.ini")
         overlay_thread["worker"] = worker
         worker.start()
         switch_button(2)
@@ -563,6 +294,60 @@ def main(page: ft.Page):
         config = configparser.ConfigParser()
         config.read(config_path)
         return config
+
+    def report_startup(report):
+        for line in report.summary():
+            add_log(line)
+        try:
+            report.save()
+        except Exception as e:
+            add_log(f"⚠️ Gagal menyimpan laporan startup: {e}")
+
+    def start_watcher():
+        stop_watcher()
+        token = object()
+        watcher_thread["token"] = token
+        # OpenCV dkk. dimuat di thread belakang; watcher dibuat setelah warm-up selesai agar UI tidak menunggu
+        startup.when_ready(lambda: create_watcher(token))
+
+    def create_watcher(token):
+        if watcher_thread["token"] is not token:
+            return
+        from process_cards import ImageProcessor
+        from input_watcher import ScreenshotWatcher
+        from matching import OnlineMatcher
+        from overlay_prerender import OverlayPrerender
+
+        # Dipanggil dari thread warm-up atau main thread UI: error harus muncul di log, bukan hilang
+        try:
+            config = load_config('config.ini')
+            with open(config['json']['offset'], "r", encoding="utf-8") as f:
+                offsets = json.load(f)
+            check_layout(config, offsets)
+            processor = ImageProcessor.from_config(config)
+            prerender = OverlayPrerender.from_config(config, offsets)
+        except Exception as e:
+            add_log(f"❌ Watcher tidak bisa dimulai: {e}", color=ft.Colors.RED)
+            return
+
+        # Pasangan sementara dicari sambil screenshot masuk (hanya sebagai progres; pasangan akhir dicatat
+        # OverlayWorker setelah matching global), base frame overlay disiapkan di background
+        online = OnlineMatcher(processor.threshold)
+        processor.online = online
+        watcher = ScreenshotWatcher(processor, offsets, on_ingest=lambda name: add_log(f"📥 {name} sudah diproses ({len(online.pairs)} pasangan sementara)"))
+        watcher_thread["watcher"] = watcher
+        watcher_thread["prerender"] = prerender
+        watcher.start()
+
+    def stop_watcher():
+        watcher = watcher_thread["watcher"]
+        if watcher and watcher.is_alive():
+            watcher.stop()
+        if watcher_thread["prerender"]:
+            watcher_thread["prerender"].shutdown()
+        watcher_thread["watcher"] = None
+        watcher_thread["prerender"] = None
+        watcher_thread["token"] = None
     
     def on_clear(e):
         config = load_config('config.ini') 
@@ -589,6 +374,9 @@ def main(page: ft.Page):
         switch_button(1)
         
         add_log("Seluruh isi folder berhasil dihapus tanpa menghapus folder utamanya.", color=ft.Colors.YELLOW)
+
+        if watcher_thread["token"]:
+            start_watcher()
  
     refresh_row = ft.Row(
         [
@@ -615,7 +403,11 @@ def main(page: ft.Page):
 
     page.add(controls_top, log_list, buttons_row)
     page.update()
-    
+
+    # Window sudah tampil: modul imaging dipanaskan di belakang
+    startup.window_ready()
+    startup.warm_up(PIPELINE_MODULES + ["win32_presenter"], on_done=report_startup)
+
     refresh_clicked()
 
 ft.app(target=main)
@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+from image_utils import OverlayCompositor
+from board_layout import BoardGeometry
+
+class OverlayPrerender:
+    # Hanya compositor (base frame) yang disiapkan di background; deskripsi overlay per pasangan
+    # cukup murah untuk dibuat OverlayWorker saat Start Memory
+    def __init__(self, offsets, screen_width, screen_height, border, box_size=52):
+        self.offsets = offsets
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Base frame (papan gelap + banner) disiapkan di background sejak awal
+        self.future = self.executor.submit(OverlayCompositor, offsets, screen_width, screen_height, border, box_size)
+
+    @classmethod
+    def from_config(cls, config, offsets, box_size=None):
+        border = tuple(int(config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+        box_size = box_size or BoardGeometry.from_config(config).box_size
+        return cls(offsets, int(config['resolusi']['lebar']), int(config['resolusi']['tinggi']), border, box_size)
+
+    def compositor(self):
+        return self.future.result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+import cv2
+
+from file_utils import clear_folder
+from process_cards import ImageProcessor
+from hero_library import HeroLibrary
+from presenter import HeadlessPresenter
+from image_utils import OverlayCompositor, create_overlay_images
+from board_layout import build_border, check_layout, check_positions
+from board_locator import BoardNotFound, apply_calibration, calibrate, calibrated_geometry, write_calibration
+from frame_source import FolderSource
+from frame_diff import diff_overlays
+from stage_trace import StageTrace
+
+TRACE_FILE = "overlay_trace.json"
+
+class OverlayWorker(threading.Thread):
+    def __init__(self, config, add_log, on_finish=None, processor=None, prerender=None, presenter=None, trace_path=TRACE_FILE, config_path=None):
+        super().__init__(daemon=True)
+        self.config = config
+        # Hasil kalibrasi disimpan ke file ini (dan [json] offset) agar sesi berikutnya langsung benar
+        self.config_path = config_path
+        self.add_log = add_log
+        self.on_finish = on_finish
+        self.processor = processor
+        self.prerender = prerender
+        # Backend tampilan: Win32Presenter di aplikasi, HeadlessPresenter untuk tes/benchmark
+        self.presenter = presenter or HeadlessPresenter()
+        self.running = True
+        self.cur_index = 0
+        self.frames = []
+        self.compositor = None
+        self.front_overlay = None
+        # Trace per tahap disimpan di samping config.ini (folder kerja aplikasi)
+        self.trace_path = trace_path
+        self.trace = None
+
+    def show_index(self, i):
+        if not self.frames:
+            return
+        self.cur_index = i % len(self.frames)
+        overlay = self.frames[self.cur_index]
+
+        # Render langsung ke back buffer: cukup tutup lubang lama dan buka lubang baru, lalu flip
+        buffer = self.presenter.back_buffer()
+        self.compositor.patch(buffer["pixels"], overlay, buffer["overlay"])
+        buffer["overlay"] = overlay
+        dirty = diff_overlays(self.front_overlay, overlay, (self.compositor.width, self.compositor.height))
+        if dirty:
+            self.presenter.present(dirty)
+        self.front_overlay = overlay
+        self.add_log(f"📸 Menampilkan gambar {self.cur_index + 1}/{len(self.frames)}")
+
+    def show_next(self):
+        self.show_index(self.cur_index + 1)
+
+    def show_prev(self):
+        self.show_index(self.cur_index - 1)
+
+    def register_hotkeys(self):
+        for key, action, ok in self.presenter.register_keys(self.show_next, self.show_prev):
+            if not ok:
+                self.add_log(f"⚠️ Gagal register hotkey {key}")
+            else:
+                self.add_log(f"✅ Hotkey {key} aktif ({action})")
+
+    def stop(self):
+        # Hotkey dan window dilepas oleh thread worker sendiri setelah loop berhenti
+        self.running = False
+        self.add_log("🛑 Overlay dihentikan dan hotkey dilepas.")
+
+    def cleanup(self):
+        try:
+            self.presenter.close()
+        except Exception:
+            pass
+        try:
+            clear_folder(self.config['folder']['process'])
+            clear_folder(self.config['folder']['output'])
+        except Exception:
+            pass
+        self.add_log("🧹 Cleanup selesai.")
+
+    def _load_offsets(self, json_file):
+        with open(json_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def calibrate(self, offsets, geometry):
+        # Posisi papan dicari ulang dari screenshot pertama setiap Start: jendela game yang digeser atau skala
+        # tampilan yang berubah tidak perlu 'Create Config' ulang. Bila gagal, positions.json tetap dipakai
+        first = next(iter(FolderSource(self.config['folder']['input'])), None)
+        if first is None:
+            return None
+        template = None
+        if self.config.has_option('kalibrasi', 'template'):
+            template = cv2.imread(self.config['kalibrasi']['template'])
+            if template is None:
+                self.add_log(f"⚠️ Template kalibrasi {self.config['kalibrasi']['template']} tidak terbaca, diambil dari screenshot")
+        try:
+            result = calibrate(first[1], geometry, template)
+            positions = {str(index): coords for index, coords in result.positions.items()}
+            calibrated = calibrated_geometry(geometry, result)
+            check_positions(positions, int(self.config['resolusi']['lebar']), int(self.config['resolusi']['tinggi']), calibrated.box_size)
+        except (BoardNotFound, ValueError) as e:
+            self.add_log(f"⚠️ Kalibrasi papan gagal ({e}), memakai {self.config['json']['offset']}")
+            return None
+        if positions == offsets and calibrated.box_size == geometry.box_size:
+            return None
+
+        border = build_border(positions, calibrated.box_size)
+        apply_calibration(self.config, border, calibrated)
+        if self.config_path:
+            try:
+                write_calibration(self.config_path, self.config['json']['offset'], positions, border, calibrated)
+            except OSError as e:
+                self.add_log(f"⚠️ Gagal menyimpan hasil kalibrasi: {e}")
+        self.add_log(f"📐 Posisi papan diperbarui dari screenshot: kartu 1 di ({positions['1']['x']}, {positions['1']['y']}), "
+                     f"kotak {calibrated.box_size} px")
+        return positions, border, calibrated
+
+    def save_trace(self):
+        if not self.trace or not self.trace.stages:
+            return
+        self.add_log(f"⏱️ {self.trace.summary()}")
+        if self.trace_path:
+            try:
+                self.trace.save(self.trace_path, self.config.getint('debug', 'trace_runs', fallback=10))
+            except Exception as e:
+                self.add_log(f"⚠️ Gagal menyimpan trace: {e}")
+
+    def run(self):
+        process = None
+        try:
+            with StageTrace(memory=self.config.getboolean('debug', 'tracemalloc', fallback=True)) as trace:
+                self.trace = trace
+                with trace.stage("config"):
+                    output_folder = self.config['folder']['output']
+                    screen_width = int(self.config['resolusi']['lebar'])
+                    screen_height = int(self.config['resolusi']['tinggi'])
+                    json_file = self.config['json']['offset']
+                    offsets = self._load_offsets(json_file)
+                    border = tuple(int(self.config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+                    geometry = check_layout(self.config, offsets)
+                    export_overlay = self.config.getboolean('debug', 'simpan_overlay', fallback=False)
+                    library = None
+                    if self.config.has_option('library', 'path'):
+                        library = HeroLibrary(self.config['library']['path'])
+
+                if self.config.getboolean('kalibrasi', 'otomatis', fallback=True):
+                    with trace.stage("calibrate"):
+                        calibrated = self.calibrate(offsets, geometry)
+                    if calibrated:
+                        # Crop watcher dan base frame overlay dibuat dengan posisi lama
+                        offsets, border, geometry = calibrated
+                        self.processor = self.prerender = None
+
+                # Screenshot yang sudah diproses watcher tidak dibaca ulang
+                process = self.processor or ImageProcessor.from_config(self.config)
+                process.trace = trace
+                self.add_log("Proses 1 : Cropping...")
+                with trace.stage("crop"):
+                    process.process_cropping(offsets)
+                self.add_log("Proses 2 : Matching...")
+                with trace.stage("match"):
+                    matched_pairs = process.process_matching(geometry.threshold, library=library)
+                    if library is not None:
+                        library.save()
+                for record in process.match_records():
+                    self.add_log(f"🧩 Pasangan kartu {record['cards'][0]} & {record['cards'][1]}")
+                self.add_log("Proses 3 : Overlaying...")
+                with trace.stage("overlay_render"):
+                    if self.prerender:
+                        self.compositor = self.prerender.compositor()
+                    else:
+                        self.compositor = OverlayCompositor(offsets, screen_width, screen_height, border, geometry.box_size)
+                    self.frames = create_overlay_images(
+                        matched_pairs,
+                        offsets,
+                        output_folder if export_overlay else None,
+                        screen_width,
+                        screen_height,
+                        *border,
+                        geometry.box_size,
+                        self.compositor
+                    )
+
+                if not self.frames:
+                    self.add_log("❌ Tidak ada gambar overlay ditemukan")
+                    self.save_trace()
+                    return
+
+                # Surface hanya seukuran papan + banner, diletakkan di posisi papan
+                with trace.stage("window"):
+                    size = (self.compositor.width, self.compositor.height)
+                    self.presenter.create_surface(self.compositor.origin, size, self.compositor.base_bgra)
+                    self.register_hotkeys()
+                with trace.stage("overlay_load"):
+                    self.show_index(0)
+
+            self.save_trace()
+            while self.running:
+                self.presenter.pump_events()
+                time.sleep(0.1)
+
+        except Exception as e:
+            self.add_log(f"❌ ERROR: {e}")
+            self.save_trace()
+        finally:
+            if process is not None:
+                process.trace = None
+            self.cleanup()
+            if self.on_finish:
+                self.on_finish()
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import deque
+
+class Presenter:
+    # Antarmuka backend tampilan overlay; OverlayWorker hanya memakai method di bawah ini.
+    # Surface punya dua buffer BGRA premultiplied: worker menggambar ke back buffer, present() menampilkan lalu flip.
+    def __init__(self):
+        self.buffers = []
+        self.back_index = 0
+        self.origin = (0, 0)
+        self.size = (0, 0)
+
+    def create_surface(self, origin, size, base):
+        raise NotImplementedError
+
+    def back_buffer(self):
+        return self.buffers[self.back_index]
+
+    def present(self, dirty=None):
+        # dirty: list rect (x, y, w, h) koordinat surface, None berarti seluruh surface
+        raise NotImplementedError
+
+    def register_keys(self, on_next, on_prev):
+        # Mengembalikan list (nama tombol, aksi, berhasil) untuk dicatat di log
+        raise NotImplementedError
+
+    def pump_events(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.buffers = []
+
+class HeadlessPresenter(Presenter):
+    # Backend tanpa window: "layar" berupa array NumPy, tombol navigasi dikirim lewat send_next/send_prev
+    def __init__(self, keep_frames=0):
+        super().__init__()
+        self.screen = None
+        self.frames = deque(maxlen=keep_frames) if keep_frames else None
+        self.timings = []
+        self.events = deque()
+        self.handlers = {}
+        self.presented = threading.Event()
+
+    def create_surface(self, origin, size, base):
+        self.origin = tuple(origin)
+        self.size = tuple(size)
+        self.buffers = [{"pixels": base.copy(), "overlay": None} for _ in range(2)]
+        self.back_index = 0
+        self.screen = base.copy()
+
+    def present(self, dirty=None):
+        start = time.perf_counter()
+        pixels = self.back_buffer()["pixels"]
+        # Sama seperti UpdateLayeredWindowIndirect: hanya area kotor yang disalin ke layar
+        for x, y, w, h in dirty or [(0, 0, *self.size)]:
+            self.screen[y:y+h, x:x+w] = pixels[y:y+h, x:x+w]
+        self.back_index ^= 1
+        self.timings.append(time.perf_counter() - start)
+        if self.frames is not None:
+            self.frames.append(self.screen.copy())
+        self.presented.set()
+
+    def register_keys(self, on_next, on_prev):
+        self.handlers = {"next": on_next, "prev": on_prev}
+        return [("next", "Next", True), ("prev", "Prev", True)]
+
+    def send(self, event):
+        # Aman dipanggil dari thread lain; handler dijalankan di thread worker saat pump_events
+        self.events.append(event)
+
+    def send_next(self):
+        self.send("next")
+
+    def send_prev(self):
+        self.send("prev")
+
+    def pump_events(self):
+        while self.events:
+            handler = self.handlers.get(self.events.popleft())
+            if handler:
+                handler()
+
+    def close(self):
+        super().close()
+        self.handlers = {}
+        self.events.clear()
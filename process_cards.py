@@ -1,56 +1,291 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import cv2
 import numpy as np
-from image_utils import compare_images, get_input_filename
+from hash_index import HashIndex
+from matching import MatchedPair, match_edges, match_pairs, nearest_pairs
+from image_utils import compute_descriptors, compute_hashes, crop_board, get_input_filename, load_board_region, pair_scores, pool_descriptors, similarity_matrix
+from frame_source import screenshot_number
+from flip_detector import FlipDetector
+from board_layout import BoardGeometry, PER_CAPTURE, THRESHOLD
+
+# Di atas jumlah kartu ini matriks skor penuh (n^2 x 10000 piksel) terlalu lambat untuk dipakai interaktif:
+# kandidat dipilih dari descriptor kasar dulu, skor piksel penuh hanya untuk k tetangga terdekat
+COARSE_CARDS = 64
+COARSE_NEIGHBORS = 8
 
 class ImageProcessor:
-    def __init__(self, input_folder, process_folder, box_size=52):
+    def __init__(self, input_folder, process_folder, box_size=52, save_crops=False, border=None, workers=1, per_capture=PER_CAPTURE, threshold=THRESHOLD):
         self.input_folder = input_folder
         self.process_folder = process_folder
         self.box_size = box_size
+        self.border = border
+        self.save_crops = save_crops
+        self.workers = max(1, int(workers or 1))
+        self.per_capture = per_capture
+        self.threshold = threshold
+        self.entries = []
+        self.files = {}
+        self.slots = {}
+        self.ingested = {}
+        self.card_ids = []
+        self.card_index = {}
+        self.found = None
+        self.crops = None
+        self.card_descriptors = None
+        self.descriptors = None
+        self.hashes = None
+        self.matches = []
+        self.online = None
+        self.trace = None
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, config, box_size=None):
+        geometry = BoardGeometry.from_config(config)
+        border = tuple(int(config['border'][key]) for key in ('x1', 'y1', 'x2', 'y2'))
+        save_crops = config.getboolean('debug', 'simpan_crop', fallback=False)
+        workers = config.getint('proses', 'workers', fallback=min(4, os.cpu_count() or 1))
+        return cls(config['folder']['input'], config['folder']['process'], box_size or geometry.box_size, save_crops, border, workers,
+                   geometry.per_capture, geometry.threshold)
+
+    def load_screenshot(self, input_file):
+        input_path = os.path.join(self.input_folder, input_file)
+        region = load_board_region(input_path, self.border)
+        if region is None:
+            print(f"⚠️ Gagal membaca {input_path}")
+        return region
+
+    def prepare(self, offsets):
+        entries = sorted((int(key), coords) for key, coords in offsets.items())
+        with self.lock:
+            if entries == self.entries:
+                return
+            self.entries = entries
+            self.card_ids = [index for index, _ in entries]
+            self.card_index = {index: n for n, index in enumerate(self.card_ids)}
+            self.crops = np.zeros((len(entries), self.box_size, self.box_size, 3), dtype=np.uint8)
+            self.found = np.zeros(len(entries), dtype=bool)
+            self.card_descriptors = np.zeros((len(entries), 100 * 100), dtype=np.float32)
+            self.ingested = {}
+
+            # Kelompokkan kartu per screenshot agar tiap file hanya dibaca sekali
+            self.files = {}
+            for n, (index, coords) in enumerate(entries):
+                self.files.setdefault(get_input_filename(index, self.per_capture), []).append((n, coords))
+            # Slot k = Screenshot_(k+1), dipakai sumber frame yang tidak berbasis nama file
+            self.slots = {screenshot_number(name)[1] - 1: name for name in self.files}
+
+    def ingest_screenshot(self, input_file):
+        cards = self.files.get(input_file)
+        if not cards:
+            return False
+        input_path = os.path.join(self.input_folder, input_file)
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self.lock:
+            if self.ingested.get(input_file) == signature:
+                return True
+
+        # Decode, crop dan descriptor dikerjakan di luar lock (cv2 melepas GIL) agar bisa paralel antar file
+        extracted = self.extract_cards(input_file, cards)
+        if extracted is None:
+            return False
+        return self.store_cards(input_file, cards, *extracted, signature)
+
+    def ingest_frame(self, slot, frame, timestamp=None):
+        # Frame layar penuh langsung dari memori (tanpa tulis/baca PNG)
+        with self.lock:
+            input_file = self.slots.get(slot)
+            if input_file is None:
+                return False
+            cards = self.files[input_file]
+        region = crop_board(frame, self.border)
+        if region is None:
+            return False
+        return self.store_cards(input_file, cards, *self.crop_cards(region, cards), ("frame", timestamp))
+
+    def ingest_card(self, card, crop):
+        # Satu crop dari detektor flip; `card` = nomor kartu di positions.json
+        with self.lock:
+            n = self.card_index.get(card)
+            if n is None:
+                return False
+            self.crops[n] = 0
+            self.crops[n, :crop.shape[0], :crop.shape[1]] = crop[:self.box_size, :self.box_size]
+            self.card_descriptors[n] = compute_descriptors(self.crops[n:n+1])[0]
+            self.found[n] = True
+
+        if self.online is not None:
+            self.online.add(n, self.card_descriptors[n])
+        return True
+
+    def store_cards(self, input_file, cards, crops, descriptors, signature):
+        with self.lock:
+            # Layout kartu berubah (prepare dipanggil ulang) selama ekstraksi: hasil dibuang
+            if self.files.get(input_file) is not cards:
+                return False
+            fresh = [n for n, _ in cards]
+            self.crops[fresh] = crops
+            self.card_descriptors[fresh] = descriptors
+            self.found[fresh] = True
+            self.ingested[input_file] = signature
+
+        # Kartu baru diteruskan ke matcher online (jika ada)
+        if self.online is not None:
+            for n in fresh:
+                self.online.add(n, self.card_descriptors[n])
+        return True
+
+    def extract_cards(self, input_file, cards):
+        with self.trace.event("decode", file=input_file) if self.trace else nullcontext():
+            region = self.load_screenshot(input_file)
+        if region is None:
+            return None
+        return self.crop_cards(region, cards)
+
+    def crop_cards(self, region, cards):
+        origin_x, origin_y = (self.border[0], self.border[1]) if self.border else (0, 0)
+        crops = np.zeros((len(cards), self.box_size, self.box_size, 3), dtype=np.uint8)
+        for k, (n, coords) in enumerate(cards):
+            x, y = coords["x"] - origin_x, coords["y"] - origin_y
+
+            # Crop area
+            crop_img = region[y:y+self.box_size, x:x+self.box_size]
+            crops[k, :crop_img.shape[0], :crop_img.shape[1]] = crop_img
+        return crops, compute_descriptors(crops)
+
+    def _map(self, func, items):
+        # Hasil selalu mengikuti urutan input, berapa pun jumlah worker
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            return list(pool.map(func, items))
+
+    def _compute_descriptors(self, crops):
+        if self.workers <= 1 or len(crops) <= 1:
+            return compute_descriptors(crops)
+        chunks = np.array_split(np.arange(len(crops)), min(self.workers, len(crops)))
+        return np.concatenate(self._map(lambda chunk: compute_descriptors(crops[chunk]), chunks))
 
     def process_cropping(self, offsets):
+        self.prepare(offsets)
+        self._map(self.ingest_screenshot, list(self.files))
+
+        # Simpan hasil crop hanya untuk debug
+        if self.save_crops:
+            self.dump_crops()
+
+        return self.crops
+
+    def process_frames(self, offsets, source):
+        self.prepare(offsets)
+        for slot, timestamp, frame in source.indexed():
+            self.ingest_frame(slot, frame, timestamp)
+
+        if self.save_crops:
+            self.dump_crops()
+
+        return self.crops
+
+    def process_stream(self, offsets, source, detector=None):
+        # Aliran frame kontinu: crop diambil otomatis saat kartu terdeteksi terbuka dan stabil
+        self.prepare(offsets)
+        detector = detector or FlipDetector(offsets, self.box_size)
+        for timestamp, frame in source:
+            for card, crop in detector.update(frame):
+                self.ingest_card(card, crop)
+
+        if self.save_crops:
+            self.dump_crops()
+
+        return self.crops
+
+    def dump_crops(self):
         os.makedirs(self.process_folder, exist_ok=True)
-        
-        for key, coords in offsets.items():
-            index = int(key)
-            x, y = coords["x"], coords["y"]
-            input_file = get_input_filename(index)
-            input_path = os.path.join(self.input_folder, input_file)
-            output_path = os.path.join(self.process_folder, f"{index}.png")
-
-            # Baca gambar
-            img = cv2.imread(input_path)
-            if img is None:
-                print(f"⚠️ Gagal membaca {input_path}")
-                continue
+        for n, index in enumerate(self.card_ids):
+            if self.found[n]:
+                output_path = os.path.join(self.process_folder, f"{index}.png")
+                cv2.imwrite(output_path, self.crops[n])
 
-            # Crop area
-            crop_img = img[y:y+self.box_size, x:x+self.box_size]
-
-            # Simpan hasil crop
-            cv2.imwrite(output_path, crop_img)
-
-    def process_matching(self, threshold):
-        cards = []
-        for i in range(1, 31):
-            path = os.path.join(self.process_folder, f"{i}.png")
-            if os.path.exists(path):
-                img = cv2.imread(path)
-                if img is not None:
-                    cards.append((i, img))
-
-        matched_pairs = []
-        checked = set()
-
-        for i in range(len(cards)):
-            if i in checked:
-                continue
-            for j in range(i + 1, len(cards)):
-                score = compare_images(cards[i][1], cards[j][1])
-                if score > threshold:
-                    matched_pairs.append((i, j))
-                    checked.update({i, j})
-                    break
-
-        return matched_pairs
+    def _load_crops(self):
+        card_ids = []
+        crops = []
+        # Nomor kartu dari nama file (1.png, 2.png, ...), berapa pun ukuran papannya
+        names = os.listdir(self.process_folder) if os.path.isdir(self.process_folder) else []
+        numbers = sorted(int(name[:-4]) for name in names if name.endswith(".png") and name[:-4].isdigit())
+        for i in numbers:
+            img = cv2.imread(os.path.join(self.process_folder, f"{i}.png"))
+            if img is not None:
+                card_ids.append(i)
+                crops.append(cv2.resize(img, (self.box_size, self.box_size)))
+        self.card_ids = card_ids
+        self.card_descriptors = None
+        self.found = np.ones(len(crops), dtype=bool)
+        self.crops = np.stack(crops) if crops else np.zeros((0, self.box_size, self.box_size, 3), dtype=np.uint8)
+        return self.crops
+
+    def process_matching(self, threshold=None, crops=None, metric="absdiff", candidates="auto", radius=12, library=None):
+        if threshold is None:
+            threshold = self.threshold
+        precomputed = crops is None
+        if crops is None:
+            crops = self.crops if self.crops is not None else self._load_crops()
+        found = self.found if self.found is not None and len(self.found) == len(crops) else np.ones(len(crops), dtype=bool)
+        cards = np.flatnonzero(found)
+
+        # Descriptor tiap kartu dihitung sekali (atau sudah dihitung saat screenshot masuk)
+        if precomputed and self.card_descriptors is not None:
+            self.descriptors = self.card_descriptors[cards]
+        else:
+            self.descriptors = self._compute_descriptors(crops[cards])
+
+        if library is not None:
+            # Tiap kartu diklasifikasikan ke ID hero, pasangan = ID yang sama
+            found_pairs = library.match(crops[cards], threshold)
+        elif candidates == "hash":
+            # Kandidat dari index Hamming, perbandingan piksel hanya untuk kandidat tersebut
+            self.hashes = compute_hashes(crops[cards])
+            index = HashIndex()
+            for value in self.hashes:
+                index.add(value)
+            pairs = index.candidate_pairs(radius)
+            scores = pair_scores(self.descriptors, pairs, metric)
+            edges = [(i, j, float(score)) for (i, j), score in zip(pairs, scores)]
+            found_pairs = match_edges(len(cards), edges, threshold)
+        elif candidates == "coarse" or (candidates == "auto" and len(cards) > COARSE_CARDS):
+            # Papan besar: tetangga terdekat dari descriptor 20x20, lalu skor penuh hanya untuk pasangan itu
+            coarse = similarity_matrix(pool_descriptors(self.descriptors), metric)
+            pairs = nearest_pairs(coarse, COARSE_NEIGHBORS)
+            scores = pair_scores(self.descriptors, pairs, metric)
+            edges = [(i, j, float(score)) for (i, j), score in zip(pairs, scores)]
+            found_pairs = match_edges(len(cards), edges, threshold)
+        else:
+            scores = similarity_matrix(self.descriptors, metric)
+            found_pairs = match_pairs(scores, threshold)
+
+        # Pasangan dipilih secara global (maximum-weight perfect matching), bukan greedy
+        self.matches = [
+            MatchedPair(int(cards[pair.first]), int(cards[pair.second]), float(pair.score), float(pair.margin))
+            for pair in found_pairs
+        ]
+
+        return [(pair.first, pair.second) for pair in self.matches]
+
+    def match_records(self):
+        # Pasangan dengan nomor kartu asli (bukan index) untuk output JSON
+        return [
+            {
+                "cards": [self.card_ids[pair.first], self.card_ids[pair.second]],
+                "score": round(pair.score, 6),
+                "margin": round(pair.margin, 6),
+            }
+            for pair in self.matches
+        ]
@@ -0,0 +1,138 @@
+import ctypes
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+def memory_info():
+    # (RSS sekarang, RSS puncak) dalam byte; None jika tidak bisa dibaca di platform ini
+    if sys.platform == "win32":
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize, counters.PeakWorkingSetSize
+        return None, None
+    try:
+        values = {}
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(value.split()[0]) * 1024
+        return values.get("VmRSS"), values.get("VmHWM")
+    except OSError:
+        return None, None
+
+class StageTrace:
+    # Catatan waktu (wall + CPU) dan memori per tahap untuk satu kali Start
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.started_tracing = False
+        self.stages = []
+        self.events = []
+        self.lock = threading.Lock()
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        # Tahap utama berjalan berurutan di thread worker, jadi puncak tracemalloc bisa di-reset per tahap
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        record = {"name": name}
+        try:
+            yield record
+        finally:
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.process_time() - cpu
+            if tracing:
+                record["alloc_peak"] = max(0, tracemalloc.get_traced_memory()[1] - base)
+            record["rss"], record["rss_peak"] = memory_info()
+            with self.lock:
+                self.stages.append(record)
+
+    @contextmanager
+    def event(self, name, **info):
+        # Kejadian kecil yang bisa paralel (mis. decode per screenshot): hanya waktu, CPU thread sendiri
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = dict(info, name=name, wall=time.perf_counter() - wall, cpu=time.thread_time() - cpu)
+            with self.lock:
+                self.events.append(record)
+
+    def summary(self):
+        parts = []
+        for record in self.stages:
+            text = f"{record['name']} {record['wall'] * 1000:.0f} ms"
+            if "alloc_peak" in record:
+                text += f" ({record['alloc_peak'] / 2**20:.1f} MB)"
+            parts.append(text)
+        decodes = [record["wall"] for record in self.events if record["name"] == "decode"]
+        if decodes:
+            parts.append(f"decode {len(decodes)}x rata-rata {sum(decodes) / len(decodes) * 1000:.0f} ms")
+        rss, rss_peak = memory_info()
+        if rss_peak:
+            parts.append(f"RSS puncak {rss_peak / 2**20:.0f} MB")
+        return " | ".join(parts)
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "total": time.perf_counter() - self.start,
+            "stages": self.stages,
+            "events": self.events,
+        }
+
+    def save(self, path, keep=10):
+        # File berisi list run terakhir (paling baru di akhir), ditulis atomik
+        runs = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                runs = json.load(f)
+        except (OSError, ValueError):
+            runs = []
+        if not isinstance(runs, list):
+            runs = []
+        runs.append(self.to_dict())
+        runs = runs[-keep:]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,193 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+
+# Modul berat (OpenCV, NumPy, PIL dan pipeline) baru dibutuhkan saat watcher/Start Memory jalan,
+# jadi dimuat di thread belakang setelah window tampil.
+PIPELINE_MODULES = [
+    "numpy",
+    "cv2",
+    "PIL.Image",
+    "image_utils",
+    "matching",
+    "process_cards",
+    "input_watcher",
+    "overlay_prerender",
+    "overlay_worker",
+]
+STARTUP_BUDGET = 1.0
+REPORT_FILE = "startup_report.json"
+
+class TimedLoader:
+    # Membungkus loader asli; atribut lain diteruskan apa adanya
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        with self._profiler.measure(self._name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.measure(self._name):
+            self._loader.exec_module(module)
+
+class _Measure:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler.stack()
+        stack.append([self.name, time.perf_counter(), 0.0])
+
+    def __exit__(self, *exc):
+        stack = self.profiler.stack()
+        name, start, children = stack.pop()
+        elapsed = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += elapsed
+        self.profiler.record(name, elapsed, elapsed - children, len(stack))
+        return False
+
+class ImportProfiler(MetaPathFinder):
+    # Versi kecil dari `python -X importtime` yang juga jalan di exe PyInstaller
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.modules = {}
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def measure(self, name):
+        return _Measure(self, name)
+
+    def record(self, name, cumulative, own, depth):
+        with self.lock:
+            entry = self.modules.setdefault(name, {"name": name, "cumulative": 0.0, "self": 0.0, "depth": depth, "thread": threading.current_thread().name})
+            entry["cumulative"] += cumulative
+            entry["self"] += own
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self.local, "finding", False):
+            return None
+        self.local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = TimedLoader(spec.loader, self, fullname)
+                    return spec
+            return None
+        finally:
+            self.local.finding = False
+
+class StartupReport:
+    def __init__(self, budget=STARTUP_BUDGET, profile=True):
+        self.start = time.perf_counter()
+        self.budget = budget
+        self.profiler = ImportProfiler() if profile else None
+        if self.profiler:
+            self.profiler.install()
+        self.ready = None
+        self.warm = None
+        self.warm_error = None
+        self.warm_done = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def window_ready(self):
+        # Dipanggil begitu window pertama kali tampil
+        if self.ready is None:
+            self.ready = time.perf_counter() - self.start
+        return self.ready
+
+    def warm_up(self, modules=PIPELINE_MODULES, on_done=None):
+        def run():
+            start = time.perf_counter()
+            try:
+                for name in modules:
+                    importlib.import_module(name)
+            except Exception as e:
+                self.warm_error = e
+            self.warm = time.perf_counter() - start
+            if self.profiler:
+                self.profiler.uninstall()
+            with self.lock:
+                self.warm_done.set()
+                callbacks, self.callbacks = self.callbacks, []
+            if on_done:
+                on_done(self)
+            for callback in callbacks:
+                callback()
+
+        threading.Thread(target=run, name="warmup", daemon=True).start()
+
+    def when_ready(self, callback):
+        # Jalankan callback setelah warm-up selesai (langsung jika sudah)
+        with self.lock:
+            if not self.warm_done.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def slowest(self, count=5):
+        if not self.profiler:
+            return []
+        with self.profiler.lock:
+            modules = list(self.profiler.modules.values())
+        return sorted(modules, key=lambda entry: entry["self"], reverse=True)[:count]
+
+    def summary(self):
+        lines = []
+        if self.ready is not None:
+            status = "✅" if self.ready <= self.budget else "⚠️"
+            lines.append(f"{status} Window siap dalam {self.ready * 1000:.0f} ms (budget {self.budget * 1000:.0f} ms)")
+        if self.warm is not None:
+            if self.warm_error:
+                lines.append(f"❌ Warm-up gagal: {self.warm_error}")
+            else:
+                lines.append(f"🔥 Modul imaging siap dalam {self.warm * 1000:.0f} ms")
+        slowest = self.slowest()
+        if slowest:
+            lines.append("Import terlama: " + ", ".join(f"{entry['name']} {entry['self'] * 1000:.0f} ms" for entry in slowest))
+        return lines
+
+    def save(self, path=REPORT_FILE):
+        modules = []
+        if self.profiler:
+            with self.profiler.lock:
+                modules = sorted(self.profiler.modules.values(), key=lambda entry: entry["self"], reverse=True)
+        report = {
+            "budget": self.budget,
+            "window_ready": self.ready,
+            "warm_up": self.warm,
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "modules": modules,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
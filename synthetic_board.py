@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import random
+import cv2
+import numpy as np
+
+from board_layout import DEFAULT_GEOMETRY, BoardGeometry, GAME_HEIGHT, GAME_WIDTH, build_border, build_positions, write_config
+from image_utils import get_input_filename
+
+# Generator sesi palsu: Screenshot_N.png berisi papan dengan kartu 2N-1 dan 2N terbuka (atau sebanyak
+# kartu_per_screenshot), kartu lain tertutup. Posisi kartu sama persis dengan hasil create_config untuk resolusi yang diminta.
+
+def make_hero_tiles(count=15, box_size=52, seed=0):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for _ in range(count):
+        # Wajah buatan: pola warna halus + beberapa lingkaran supaya ada tepi seperti gambar asli
+        base = rng.integers(0, 256, (6, 6, 3), dtype=np.uint8)
+        tile = cv2.resize(base, (box_size, box_size), interpolation=cv2.INTER_CUBIC)
+        for _ in range(3):
+            center = tuple(int(v) for v in rng.integers(8, box_size - 8, 2))
+            radius = int(rng.integers(4, box_size // 4))
+            color = tuple(int(v) for v in rng.integers(0, 256, 3))
+            cv2.circle(tile, center, radius, color, -1, lineType=cv2.LINE_AA)
+        tiles.append(tile)
+    return tiles
+
+def load_hero_tiles(folder, box_size=52):
+    tiles = []
+    for name in sorted(os.listdir(folder)):
+        img = cv2.imread(os.path.join(folder, name))
+        if img is not None:
+            tiles.append(cv2.resize(img, (box_size, box_size), interpolation=cv2.INTER_AREA))
+    return tiles
+
+def make_card_back(box_size=52):
+    back = np.full((box_size, box_size, 3), (90, 50, 30), dtype=np.uint8)
+    cv2.rectangle(back, (3, 3), (box_size - 4, box_size - 4), (40, 170, 220), 2)
+    cv2.line(back, (6, 6), (box_size - 7, box_size - 7), (40, 170, 220), 1, lineType=cv2.LINE_AA)
+    cv2.line(back, (box_size - 7, 6), (6, box_size - 7), (40, 170, 220), 1, lineType=cv2.LINE_AA)
+    return back
+
+def make_background(screen_width, screen_height, rng):
+    # Tekstur frekuensi rendah untuk desktop + jendela game polos di tengah layar
+    small = rng.integers(0, 256, (max(2, screen_height // 120), max(2, screen_width // 120), 3), dtype=np.uint8)
+    background = cv2.resize(small, (screen_width, screen_height), interpolation=cv2.INTER_LINEAR)
+    x = (screen_width - GAME_WIDTH) // 2
+    y = (screen_height - GAME_HEIGHT) // 2
+    background[max(0, y):y + GAME_HEIGHT, max(0, x):x + GAME_WIDTH] = (35, 28, 24)
+    return background
+
+def shift_subpixel(tile, dx, dy):
+    matrix = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(tile, matrix, (tile.shape[1], tile.shape[0]), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def render_screenshot(background, positions, faces, card_back, rng, noise=0.0, brightness=0, jitter=0.0):
+    img = background.copy()
+    box_size = card_back.shape[0]
+    for index, coords in positions.items():
+        tile = faces.get(index, card_back)
+        if jitter and index in faces:
+            tile = shift_subpixel(tile, *rng.uniform(-jitter, jitter, 2))
+        x, y = coords["x"], coords["y"]
+        img[y:y+box_size, x:x+box_size] = tile
+
+    # Noise dan perubahan kecerahan hanya di area jendela game (bagian yang dibaca pipeline)
+    if noise or brightness:
+        x1, y1, x2, y2 = build_border(positions, box_size)
+        region = img[y1:y2, x1:x2].astype(np.float32)
+        if brightness:
+            region += rng.uniform(-brightness, brightness)
+        if noise:
+            region += rng.normal(0, noise, region.shape)
+        img[y1:y2, x1:x2] = np.clip(region, 0, 255).astype(np.uint8)
+    return img
+
+def generate_session(folder, screen_width, screen_height, tiles=None, noise=0.0, brightness=0, jitter=0.0, seed=0, geometry=DEFAULT_GEOMETRY):
+    rng = np.random.default_rng(seed)
+    box_size = geometry.box_size
+    positions = build_positions(screen_width, screen_height, geometry)
+    tiles = tiles or make_hero_tiles(len(positions) // 2, box_size, seed)
+    card_back = make_card_back(box_size)
+
+    # Tiap hero muncul tepat dua kali di posisi acak
+    heroes = [n % len(tiles) for n in range(len(positions))]
+    random.Random(seed).shuffle(heroes)
+    hero_of = {index: heroes[index - 1] for index in positions}
+
+    input_path = os.path.join(folder, "input")
+    process_path = os.path.join(folder, "process")
+    output_path = os.path.join(folder, "output")
+    for path in (input_path, process_path, output_path):
+        os.makedirs(path, exist_ok=True)
+
+    background = make_background(screen_width, screen_height, rng)
+    screenshots = {}
+    for index in positions:
+        screenshots.setdefault(get_input_filename(index, geometry.per_capture), []).append(index)
+    for name, shown in screenshots.items():
+        faces = {index: tiles[hero_of[index]] for index in shown}
+        img = render_screenshot(background, positions, faces, card_back, rng, noise, brightness, jitter)
+        cv2.imwrite(os.path.join(input_path, name), img)
+
+    offset_path = os.path.join(folder, "positions.json")
+    with open(offset_path, "w") as f:
+        json.dump(positions, f, indent=2)
+    config_path = os.path.join(folder, "config.ini")
+    write_config(config_path, screen_width, screen_height, input_path + os.sep, process_path + os.sep, output_path + os.sep, build_border(positions, box_size), offset_path, geometry)
+
+    # Kunci jawaban: pasangan posisi (0-based, sama seperti hasil process_matching)
+    by_hero = {}
+    for index in sorted(positions):
+        by_hero.setdefault(hero_of[index], []).append(index - 1)
+    pairs = sorted(tuple(members) for members in by_hero.values() if len(members) == 2)
+    # Kunci string seperti positions.json yang dibaca ulang dengan json.load
+    offsets = {str(index): coords for index, coords in positions.items()}
+    return {"config": config_path, "positions": offsets, "pairs": pairs}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat sesi Memory Game sintetis")
+    parser.add_argument("folder")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--tiles", metavar="FOLDER", default=None, help="folder gambar wajah hero (default: wajah buatan)")
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--brightness", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--board", default=None, metavar="BARISxKOLOM", help="ukuran papan, mis. 20x25 (default: 5x6)")
+    args = parser.parse_args(argv)
+
+    geometry = DEFAULT_GEOMETRY
+    if args.board:
+        try:
+            rows, cols = (int(v) for v in args.board.lower().split("x"))
+            geometry = BoardGeometry.validated(*geometry._replace(rows=rows, cols=cols))
+        except ValueError as e:
+            parser.error(f"--board {args.board}: {e}")
+    tiles = load_hero_tiles(args.tiles, geometry.box_size) if args.tiles else None
+    try:
+        session = generate_session(args.folder, args.width, args.height, tiles, args.noise, args.brightness, args.jitter, args.seed, geometry)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"✅ Sesi dibuat di {args.folder}: {len(session['pairs'])} pasangan")
+    print(json.dumps(session["pairs"]))
+
+if __name__ == "__main__":
+    main()
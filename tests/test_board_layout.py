@@ -0,0 +1,55 @@
+import configparser
+
+import pytest
+
+from board_layout import DEFAULT_GEOMETRY, BoardGeometry, build_border, build_positions, check_layout
+
+def make_config(**papan):
+    config = configparser.ConfigParser()
+    config.read_dict({"resolusi": {"lebar": "1920", "tinggi": "1080"}})
+    if papan:
+        config.read_dict({"papan": {key: str(value) for key, value in papan.items()}})
+    return config
+
+def test_missing_section_is_default_board():
+    assert BoardGeometry.from_config(make_config()) == DEFAULT_GEOMETRY
+
+def test_geometry_from_config():
+    geometry = BoardGeometry.from_config(make_config(baris=4, kolom=8, box=40, kartu_per_screenshot=4, jarak_x=50, jarak_y=48, threshold=0.85))
+    assert geometry == (4, 8, 40, 4, 50, 48, 0.85)
+    assert geometry.cards == 32
+
+@pytest.mark.parametrize("papan", [{"baris": 0}, {"kolom": -6}, {"box": 0}, {"jarak_x": 0}, {"kartu_per_screenshot": 0}, {"baris": 5, "kolom": 5}, {"baris": "lima"}])
+def test_invalid_papan_is_rejected(papan):
+    with pytest.raises(ValueError):
+        BoardGeometry.from_config(make_config(**papan))
+
+def test_default_positions_unchanged():
+    positions = build_positions(1920, 1080)
+    assert len(positions) == 30
+    assert positions[1] == {"x": 604, "y": 428}
+    assert positions[30] == {"x": 924, "y": 668}
+    assert build_border(positions) == (590, 420, 990, 728)
+
+def test_positions_follow_geometry():
+    geometry = BoardGeometry.from_config(make_config(baris=4, kolom=8, box=40, jarak_x=50, jarak_y=48))
+    positions = build_positions(1920, 1080, geometry)
+    assert len(positions) == 32
+    assert positions[2]["x"] - positions[1]["x"] == 50
+    assert positions[9]["y"] - positions[1]["y"] == 48
+    assert check_layout(make_config(baris=4, kolom=8, box=40, jarak_x=50, jarak_y=48), positions) == geometry
+
+def test_board_larger_than_screen_is_rejected():
+    with pytest.raises(ValueError):
+        build_positions(1280, 720, DEFAULT_GEOMETRY._replace(rows=20, cols=25))
+
+def test_layout_rejects_card_count_mismatch():
+    positions = build_positions(1920, 1080)
+    with pytest.raises(ValueError, match="30 kartu"):
+        check_layout(make_config(baris=4, kolom=8), positions)
+
+def test_layout_rejects_off_screen_card():
+    positions = build_positions(1920, 1080)
+    positions[30] = {"x": 1900, "y": 668}
+    with pytest.raises(ValueError, match="di luar layar"):
+        check_layout(make_config(), positions)
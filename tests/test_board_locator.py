@@ -0,0 +1,108 @@
+import configparser
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from board_layout import BoardGeometry, DEFAULT_GEOMETRY, build_positions
+from board_locator import BoardNotFound, calibrate, calibrated_geometry, locate_board, write_calibration
+from synthetic_board import make_background, make_card_back, make_hero_tiles, render_screenshot
+
+WIDTH, HEIGHT = 1280, 720
+
+@pytest.fixture(scope="module")
+def scene():
+    rng = np.random.default_rng(0)
+    return {
+        "back": make_card_back(),
+        "tiles": make_hero_tiles(15),
+        "background": make_background(WIDTH, HEIGHT, rng),
+        "base": build_positions(WIDTH, HEIGHT),
+    }
+
+def shifted(positions, dx, dy):
+    return {index: {"x": coords["x"] + dx, "y": coords["y"] + dy} for index, coords in positions.items()}
+
+def screenshot(scene, positions, face_up, seed=0):
+    rng = np.random.default_rng(seed)
+    faces = {index: scene["tiles"][index % len(scene["tiles"])] for index in face_up}
+    return render_screenshot(scene["background"], positions, faces, scene["back"], rng, noise=3, brightness=8)
+
+# Papan bergeser di semua fase modulo 4 (scale tahap kasar) dan sampai menyentuh tepi screenshot
+OFFSETS = [(dx, dy) for dx in (-280, -137, -61, -2, 0, 1, 3, 45, 170, 333, 598) for dy in (-240, -121, -3, 0, 2, 41, 97, 175)]
+
+@pytest.mark.parametrize("dx,dy", OFFSETS)
+def test_locate_board_offset_sweep(scene, dx, dy):
+    positions = shifted(scene["base"], dx, dy)
+    found, spacing, matched, box_size = locate_board(screenshot(scene, positions, (7, 8), seed=(dx + 1000) * 1000 + dy + 1000), scene["back"])
+    assert found == positions
+    assert spacing == pytest.approx((64, 60), abs=0.5)
+    assert matched == 28
+    assert box_size == 52
+
+@pytest.mark.parametrize("dx,dy", [(-137, 41), (0, 0), (101, -57)])
+def test_face_up_edge_row_is_ambiguous_not_shifted(scene, dx, dy):
+    # Baris pertama terbuka semua: grid bisa berada satu baris di atas atau di bawah, jadi harus gagal
+    positions = shifted(scene["base"], dx, dy)
+    with pytest.raises(BoardNotFound):
+        locate_board(screenshot(scene, positions, range(1, 7)), scene["back"])
+
+def test_face_up_edge_row_resolved_by_screen_edge(scene):
+    # Satu baris di bawah papan sudah di luar screenshot, jadi hanya satu posisi grid yang mungkin
+    base = scene["base"]
+    dy = HEIGHT - (base[30]["y"] + 52) - 10
+    positions = shifted(base, 0, dy)
+    found, _, _, _ = locate_board(screenshot(scene, positions, range(1, 7)), scene["back"])
+    assert found == positions
+
+def test_face_up_edge_column(scene):
+    positions = shifted(scene["base"], -61, 97)
+    with pytest.raises(BoardNotFound):
+        locate_board(screenshot(scene, positions, range(1, 31, 6)), scene["back"])
+
+def test_no_board(scene):
+    with pytest.raises(BoardNotFound):
+        locate_board(scene["background"].copy(), scene["back"])
+
+# Template diambil dari screenshot sendiri; papan tetap di dalam jendela game (latar celah antar kartu polos)
+@pytest.mark.parametrize("dx,dy", [(-40, -150), (0, 0), (1, 3), (3, -3), (170, 97), (333, 41)])
+@pytest.mark.parametrize("face_up", [(1, 2), (7, 8), (29, 30)])
+def test_calibrate_without_template(scene, dx, dy, face_up):
+    positions = shifted(scene["base"], dx, dy)
+    found, _, matched, box_size = calibrate(screenshot(scene, positions, face_up, seed=dx * 10 + dy + 5000))
+    assert found == positions
+    assert matched == 28
+    assert box_size == 52
+
+# Skala tampilan berbeda dengan [papan] (DPI 110% / 125%): posisi dan ukuran kartu ikut diskalakan
+@pytest.mark.parametrize("factor", [1.1, 1.25])
+@pytest.mark.parametrize("with_template", [False, True])
+def test_calibrate_scaled_screenshot(scene, factor, with_template):
+    image = cv2.resize(screenshot(scene, scene["base"], (1, 2)), None, fx=factor, fy=factor, interpolation=cv2.INTER_LINEAR)
+    result = calibrate(image, DEFAULT_GEOMETRY, scene["back"] if with_template else None)
+    for index, coords in scene["base"].items():
+        assert result.positions[index]["x"] == pytest.approx(coords["x"] * factor, abs=1)
+        assert result.positions[index]["y"] == pytest.approx(coords["y"] * factor, abs=1)
+    assert result.box_size == pytest.approx(52 * factor, abs=1.5)
+    assert result.spacing == pytest.approx((64 * factor, 60 * factor), abs=1)
+
+def test_calibrate_without_template_no_board(scene):
+    with pytest.raises(BoardNotFound):
+        calibrate(scene["background"].copy())
+
+def test_write_calibration(scene, tmp_path):
+    config_path = tmp_path / "config.ini"
+    positions_path = tmp_path / "positions.json"
+    config_path.write_text("[resolusi]\nlebar=1600\ntinggi=900\n\n[papan]\nbaris=5\nkolom=6\n")
+    image = cv2.resize(screenshot(scene, scene["base"], (1, 2)), None, fx=1.25, fy=1.25, interpolation=cv2.INTER_LINEAR)
+    result = calibrate(image)
+    geometry = calibrated_geometry(DEFAULT_GEOMETRY, result)
+    write_calibration(str(config_path), str(positions_path), result.positions, (1, 2, 3, 4), geometry)
+
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    assert BoardGeometry.from_config(config) == geometry
+    assert (geometry.jarak_x, geometry.jarak_y) == (80, 75)
+    assert [config.getint("border", key) for key in ("x1", "y1", "x2", "y2")] == [1, 2, 3, 4]
+    assert json.loads(positions_path.read_text()) == {str(index): coords for index, coords in result.positions.items()}
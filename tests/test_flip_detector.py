@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+import pytest
+
+from board_layout import build_border, build_positions
+from flip_detector import FlipDetector
+from synthetic_board import make_background, make_card_back, make_hero_tiles
+
+WIDTH, HEIGHT = 1920, 1080
+
+@pytest.fixture(scope="module")
+def scene():
+    rng = np.random.default_rng(0)
+    positions = build_positions(WIDTH, HEIGHT)
+    return {
+        "positions": positions,
+        "offsets": {str(index): coords for index, coords in positions.items()},
+        "background": make_background(WIDTH, HEIGHT, rng),
+        "back": make_card_back(),
+        "tiles": make_hero_tiles(15),
+    }
+
+def render(scene, shown, rng):
+    img = scene["background"].copy()
+    for index, coords in scene["positions"].items():
+        x, y = coords["x"], coords["y"]
+        img[y:y+52, x:x+52] = shown.get(index, scene["back"])
+    x1, y1, x2, y2 = build_border(scene["positions"])
+    region = img[y1:y2, x1:x2].astype(np.int16) + rng.integers(-3, 4, (y2 - y1, x2 - x1, 3))
+    img[y1:y2, x1:x2] = np.clip(region, 0, 255)
+    return img
+
+def squeeze(tile, fraction):
+    out = np.full_like(tile, 35)
+    width = max(1, int(52 * fraction))
+    x = (52 - width) // 2
+    out[:, x:x+width] = cv2.resize(tile, (width, 52))
+    return out
+
+def run(detector, frames):
+    crops = {}
+    for frame in frames:
+        for card, crop in detector.update(frame):
+            # Crop yang lebih baru untuk kartu yang sama menggantikan yang lama
+            crops[card] = crop
+    return crops
+
+@pytest.mark.parametrize("length", [5, 10, 20, 40, 120])
+def test_slow_fade_is_captured(scene, length):
+    # Tampak belakang berganti ke wajah kartu secara linear selama `length` frame (120 = 2 detik di 60 fps)
+    rng = np.random.default_rng(length)
+    face = scene["tiles"][0]
+
+    def frames():
+        for _ in range(5):
+            yield render(scene, {}, rng)
+        for alpha in np.linspace(0, 1, length):
+            blend = cv2.addWeighted(scene["back"], 1 - alpha, face, alpha, 0)
+            yield render(scene, {1: blend}, rng)
+        for _ in range(10):
+            yield render(scene, {1: face}, rng)
+
+    crops = run(FlipDetector(scene["offsets"]), frames())
+    assert list(crops) == [1]
+    assert np.abs(crops[1].astype(int) - face.astype(int)).mean() < 6
+
+def test_flip_animation_at_60_fps(scene):
+    # Tiap pasangan dibuka (kartu menyempit lalu wajah melebar), ditahan, lalu ditutup lagi
+    rng = np.random.default_rng(1)
+    tiles = scene["tiles"]
+    shown = {}
+
+    def frames():
+        for _ in range(10):
+            yield render(scene, shown, rng)
+        for k in range(5):
+            pair = (2 * k + 1, 2 * k + 2)
+            for card in pair:
+                for fraction in np.linspace(1, 0, 5):
+                    shown[card] = squeeze(scene["back"], fraction)
+                    yield render(scene, shown, rng)
+                for fraction in np.linspace(0, 1, 5):
+                    shown[card] = squeeze(tiles[card % 15], fraction)
+                    yield render(scene, shown, rng)
+                shown[card] = tiles[card % 15]
+                for _ in range(20):
+                    yield render(scene, shown, rng)
+            for card in pair:
+                for fraction in np.linspace(1, 0, 4):
+                    shown[card] = squeeze(tiles[card % 15], fraction)
+                    yield render(scene, shown, rng)
+                for fraction in np.linspace(0, 1, 4):
+                    shown[card] = squeeze(scene["back"], fraction)
+                    yield render(scene, shown, rng)
+                shown.pop(card)
+            for _ in range(10):
+                yield render(scene, shown, rng)
+
+    detector = FlipDetector(scene["offsets"])
+    crops = run(detector, frames())
+    assert sorted(crops) == list(range(1, 11))
+    for card, crop in crops.items():
+        assert np.abs(crop.astype(int) - tiles[card % 15].astype(int)).max() <= 3
+    # Frame diam tetap dilewati lebih awal
+    assert detector.skipped > 0
+
+def test_still_board_emits_nothing(scene):
+    rng = np.random.default_rng(2)
+    detector = FlipDetector(scene["offsets"])
+    assert run(detector, (render(scene, {}, rng) for _ in range(30))) == {}
+    assert detector.skipped == 29
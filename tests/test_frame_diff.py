@@ -0,0 +1,96 @@
+import numpy as np
+
+from frame_diff import bounding_rect, clip_rect, diff_buffers, diff_overlays, merge_rects
+from image_utils import OverlayFrame
+
+SIZE = (400, 300)
+BORDER = (10, 40, 390, 290)
+
+def overlay(*holes, banner="Alt + Z: Prev | Alt + X: Next"):
+    return OverlayFrame(BORDER, tuple(holes), banner)
+
+def render(frame, size=SIZE):
+    # Rasterisasi sederhana: latar gelap, lubang transparan
+    pixels = np.full((size[1], size[0], 4), 200, dtype=np.uint8)
+    for x, y, w, h in frame.holes:
+        pixels[y:y+h, x:x+w] = 0
+    return pixels
+
+def covered(rects, size=SIZE):
+    mask = np.zeros((size[1], size[0]), dtype=bool)
+    for x, y, w, h in rects:
+        mask[y:y+h, x:x+w] = True
+    return mask
+
+def test_same_pair_has_no_dirty_rect():
+    frame = overlay((20, 50, 52, 52), (84, 50, 52, 52))
+    assert diff_overlays(frame, frame, SIZE) == []
+
+def test_unknown_previous_is_full_frame():
+    assert diff_overlays(None, overlay((20, 50, 52, 52)), SIZE) == [(0, 0, 400, 300)]
+
+def test_banner_change_is_full_frame():
+    previous = overlay((20, 50, 52, 52))
+    current = overlay((20, 50, 52, 52), banner="lain")
+    assert diff_overlays(previous, current, SIZE) == [(0, 0, 400, 300)]
+
+def test_disjoint_pairs_dirty_only_their_holes():
+    previous = overlay((20, 50, 52, 52), (148, 170, 52, 52))
+    current = overlay((276, 50, 52, 52), (84, 230, 52, 52))
+    assert diff_overlays(previous, current, SIZE) == sorted([(20, 50, 52, 52), (148, 170, 52, 52), (276, 50, 52, 52), (84, 230, 52, 52)])
+
+def test_shared_hole_is_not_dirty():
+    previous = overlay((20, 50, 52, 52), (148, 170, 52, 52))
+    current = overlay((20, 50, 52, 52), (276, 50, 52, 52))
+    assert diff_overlays(previous, current, SIZE) == [(148, 170, 52, 52), (276, 50, 52, 52)]
+
+def test_overlapping_holes_are_merged():
+    previous = overlay((20, 50, 52, 52))
+    current = overlay((40, 60, 52, 52))
+    assert diff_overlays(previous, current, SIZE) == [(20, 50, 72, 62)]
+
+def test_merge_rects_chains_and_drops_empty():
+    rects = [(0, 0, 10, 10), (8, 0, 10, 10), (16, 0, 10, 10), (100, 100, 5, 5), (50, 50, 0, 10)]
+    assert merge_rects(rects) == [(0, 0, 26, 10), (100, 100, 5, 5)]
+
+def test_bounding_rect():
+    assert bounding_rect([]) is None
+    assert bounding_rect([(5, 5, 10, 10), (30, 0, 5, 40)]) == (5, 0, 30, 40)
+
+def test_clip_rect_at_surface_edges():
+    assert clip_rect((-10, -5, 30, 20), SIZE) == (0, 0, 20, 15)
+    assert clip_rect((380, 290, 52, 52), SIZE) == (380, 290, 20, 10)
+    assert clip_rect((400, 10, 10, 10), SIZE) is None
+    assert clip_rect((-20, 10, 20, 10), SIZE) is None
+
+def test_hole_past_edge_is_clipped():
+    previous = overlay((370, 270, 52, 52))
+    current = overlay((20, 50, 52, 52))
+    assert diff_overlays(previous, current, SIZE) == [(20, 50, 52, 52), (370, 270, 30, 30)]
+
+def test_diff_buffers_identical_and_unknown():
+    frame = render(overlay((20, 50, 52, 52)))
+    assert diff_buffers(frame, frame.copy()) == []
+    assert diff_buffers(None, frame) == [(0, 0, 400, 300)]
+    assert diff_buffers(frame[:100], frame) == [(0, 0, 400, 300)]
+
+def test_diff_buffers_covers_every_changed_pixel():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        holes = [tuple(int(v) for v in (rng.integers(0, 380), rng.integers(0, 280), 52, 52)) for _ in range(4)]
+        previous = render(overlay(*holes[:2]))
+        current = render(overlay(*holes[2:]))
+        changed = np.any(previous != current, axis=-1)
+        rects = diff_buffers(previous, current, tile=16)
+        mask = covered(rects)
+        # Semua piksel yang berubah tercakup, dan rect tidak keluar dari frame
+        assert not (changed & ~mask).any()
+        assert all(clip_rect(rect, SIZE) == rect for rect in rects)
+        # Rect dari deskripsi overlay juga mencakup semua piksel yang berubah
+        assert not (changed & ~covered(diff_overlays(overlay(*holes[:2]), overlay(*holes[2:]), SIZE))).any()
+
+def test_diff_buffers_tiles_are_tight():
+    previous = np.zeros((64, 64, 4), dtype=np.uint8)
+    current = previous.copy()
+    current[20, 40] = 1
+    assert diff_buffers(previous, current, tile=16) == [(32, 16, 16, 16)]
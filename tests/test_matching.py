@@ -0,0 +1,139 @@
+import random
+
+import numpy as np
+import pytest
+
+from matching import OnlineMatcher, match_edges, match_pairs, max_weight_matching
+
+def brute_force(nvertex, edges, maxcardinality):
+    # Semua matching dienumerasi; kunci = (jumlah pasangan jika maxcardinality, total bobot)
+    weight = {}
+    for i, j, w in edges:
+        weight[(min(i, j), max(i, j))] = max(w, weight.get((min(i, j), max(i, j)), w))
+
+    def key(result):
+        return result if maxcardinality else (result[1], result[0])
+
+    def search(free):
+        if not free:
+            return (0, 0)
+        v, rest = free[0], free[1:]
+        best = search(rest)
+        for k, u in enumerate(rest):
+            w = weight.get((min(u, v), max(u, v)))
+            if w is None:
+                continue
+            count, total = search(rest[:k] + rest[k + 1:])
+            best = max(best, (count + 1, total + w), key=key)
+        return best
+
+    count, total = search(tuple(range(nvertex)))
+    return (count, total) if maxcardinality else (0, total)
+
+def score(mate, edges, maxcardinality):
+    weight = {(min(i, j), max(i, j)): w for i, j, w in edges}
+    pairs = [(v, u) for v, u in enumerate(mate) if u > v]
+    for v, u in enumerate(mate):
+        assert u == -1 or mate[u] == v
+    total = sum(weight[pair] for pair in pairs)
+    return (len(pairs), total) if maxcardinality else (0, total)
+
+def random_graph(rng, nvertex, density, low):
+    edges = []
+    for i in range(nvertex):
+        for j in range(i + 1, nvertex):
+            if rng.random() < density:
+                edges.append((i, j, rng.randint(low, 20)))
+    return edges
+
+@pytest.mark.parametrize("maxcardinality", [False, True])
+def test_blossom_matches_brute_force(maxcardinality):
+    rng = random.Random(4)
+    for _ in range(400):
+        nvertex = rng.randint(2, 9)
+        edges = random_graph(rng, nvertex, rng.choice([0.3, 0.6, 1.0]), rng.choice([-5, 0, 1]))
+        if not edges:
+            continue
+        mate = max_weight_matching(edges, maxcardinality)
+        used = 1 + max(max(i, j) for i, j, _ in edges)
+        assert score(mate, edges, maxcardinality) == brute_force(used, edges, maxcardinality)
+
+def test_blossom_odd_cycle():
+    # Segitiga + ekor: butuh blossom agar vertex 3 tetap mendapat pasangan
+    edges = [(0, 1, 8), (1, 2, 9), (0, 2, 10), (2, 3, 7)]
+    assert max_weight_matching(edges) == [1, 0, 3, 2]
+    assert max_weight_matching(edges, maxcardinality=True) == [1, 0, 3, 2]
+
+def test_maxcardinality_prefers_more_pairs():
+    edges = [(0, 1, 2), (1, 2, 10), (2, 3, 2)]
+    assert max_weight_matching(edges) == [-1, 2, 1, -1]
+    assert max_weight_matching(edges, maxcardinality=True) == [1, 0, 3, 2]
+
+def test_greedy_trap():
+    # Greedy "j pertama di atas 0.9" memasangkan 0-1 dan meninggalkan 2-3 di bawah threshold;
+    # assignment global memasangkan 0-2 dan 1-3
+    scores = np.array([
+        [1.00, 0.95, 0.97, 0.50],
+        [0.95, 1.00, 0.50, 0.96],
+        [0.97, 0.50, 1.00, 0.60],
+        [0.50, 0.96, 0.60, 1.00],
+    ], dtype=np.float32)
+    pairs = match_pairs(scores, threshold=0.9)
+    assert sorted((pair.first, pair.second) for pair in pairs) == [(0, 2), (1, 3)]
+    by_cards = {(pair.first, pair.second): pair for pair in pairs}
+    assert by_cards[(0, 2)].score == pytest.approx(0.97)
+    # Margin = skor pasangan dikurangi kandidat kedua terbaik dari salah satu kartunya (0-1 = 0.95)
+    assert by_cards[(0, 2)].margin == pytest.approx(0.97 - 0.95, abs=1e-6)
+    assert by_cards[(1, 3)].margin == pytest.approx(0.96 - 0.95, abs=1e-6)
+
+def test_match_pairs_is_globally_optimal():
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        n = int(rng.choice([4, 6, 8]))
+        scores = rng.uniform(0.5, 1.0, (n, n)).astype(np.float32)
+        scores = (scores + scores.T) / 2
+        pairs = match_pairs(scores)
+        assert len(pairs) == n // 2
+        total = sum(pair.score for pair in pairs)
+        edges = [(i, j, int(round(float(scores[i, j]) * 1_000_000))) for i in range(n) for j in range(i + 1, n)]
+        assert round(total * 1_000_000) == pytest.approx(brute_force(n, edges, True)[1], abs=n)
+
+def test_threshold_drops_weak_pairs_and_splits_components():
+    # Dua komponen terpisah di atas threshold; sisi lemah tidak pernah dikeluarkan
+    edges = [(0, 1, 0.99), (2, 3, 0.98), (4, 5, 0.97), (1, 2, 0.50), (3, 4, 0.40), (6, 7, 0.30)]
+    pairs = match_edges(8, edges, threshold=0.9)
+    assert sorted((pair.first, pair.second) for pair in pairs) == [(0, 1), (2, 3), (4, 5)]
+    assert match_edges(8, [(6, 7, 0.3)], threshold=0.9) == []
+
+def hero_descriptors(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (count, 400)).astype(np.float32)
+
+def test_online_pair_emitted_when_partner_appears():
+    heroes = hero_descriptors(3)
+    emitted = []
+    online = OnlineMatcher(0.9, on_pair=emitted.append)
+    assert online.add(0, heroes[0]) is None
+    assert online.add(1, heroes[1]) is None
+    pair = online.add(2, heroes[0])
+    assert (pair.first, pair.second) == (0, 2)
+    assert emitted == [pair]
+    assert online.add(3, heroes[1]).first == 1
+
+def test_online_readd_replaces_stale_descriptor():
+    # Screenshot diambil ulang: kartu 2 ternyata hero lain, pasangan lama (0, 2) dibatalkan dan dinilai ulang
+    heroes = hero_descriptors(3)
+    emitted = []
+    online = OnlineMatcher(0.9, on_pair=emitted.append)
+    for card, hero in enumerate((0, 1, 0, 2)):
+        online.add(card, heroes[hero])
+    assert [(pair.first, pair.second) for pair in online.pairs] == [(0, 2)]
+
+    pair = online.add(2, heroes[1])
+    assert (pair.first, pair.second) == (1, 2)
+    assert sorted((pair.first, pair.second) for pair in online.pairs) == [(1, 2)]
+    assert online.partner == {1: 2, 2: 1}
+
+    # Kartu 0 yang ditinggal berpasangan lagi begitu hero-nya muncul
+    online.add(4, heroes[0])
+    assert sorted((pair.first, pair.second) for pair in online.pairs) == [(0, 4), (1, 2)]
+    assert len(online.cards) == len(online.descriptors) == 5
@@ -0,0 +1,211 @@
+import ctypes
+from ctypes import wintypes
+import win32con
+import win32gui
+import win32api
+import numpy as np
+
+from frame_diff import bounding_rect
+from presenter import Presenter
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 1)
+    ]
+
+class BLENDFUNCTION(ctypes.Structure):
+    _fields_ = [
+        ("BlendOp", ctypes.c_ubyte),
+        ("BlendFlags", ctypes.c_ubyte),
+        ("SourceConstantAlpha", ctypes.c_ubyte),
+        ("AlphaFormat", ctypes.c_ubyte)
+    ]
+
+class UPDATELAYEREDWINDOWINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("hdcDst", wintypes.HDC),
+        ("pptDst", ctypes.c_void_p),
+        ("psize", ctypes.c_void_p),
+        ("hdcSrc", wintypes.HDC),
+        ("pptSrc", ctypes.c_void_p),
+        ("crKey", wintypes.DWORD),
+        ("pblend", ctypes.c_void_p),
+        ("dwFlags", wintypes.DWORD),
+        ("prcDirty", ctypes.c_void_p),
+    ]
+
+class Win32Presenter(Presenter):
+    # Layered window + dua DIB section; semua method dipanggil dari thread OverlayWorker
+    HOTKEY_PREV_ID = 1
+    HOTKEY_NEXT_ID = 2
+    MOD_ALT = 0x0001
+    VK_Z = 0x5A
+    VK_X = 0x58
+
+    def __init__(self):
+        super().__init__()
+        self.hwnd_main = None
+        self.screen_dc = None
+        self.handlers = {}
+        self.hotkeys = []
+
+        self.user32 = ctypes.windll.user32
+        self.gdi32 = ctypes.windll.gdi32
+
+    def wnd_proc_factory(self):
+        def wnd_proc(hwnd, msg, wparam, lparam):
+            if msg == win32con.WM_DESTROY:
+                win32gui.PostQuitMessage(0)
+                return 0
+            elif msg == win32con.WM_HOTKEY:
+                handler = self.handlers.get(wparam & 0xffff)
+                if handler:
+                    handler()
+                return 0
+            return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+        return wnd_proc
+
+    def create_layered_window(self, width, height, x=0, y=0):
+        hInstance = win32api.GetModuleHandle(None)
+        className = "OverlayWindow"
+
+        wndClass = win32gui.WNDCLASS()
+        wndClass.lpfnWndProc = self.wnd_proc_factory()
+        wndClass.hInstance = hInstance
+        wndClass.lpszClassName = className
+
+        try:
+            atom = win32gui.RegisterClass(wndClass)
+        except win32gui.error as e:
+            if e.winerror == 1410:
+                atom = className
+            else:
+                raise
+
+        exStyle = win32con.WS_EX_LAYERED | win32con.WS_EX_TOPMOST
+        style = win32con.WS_POPUP
+
+        hwnd = win32gui.CreateWindowEx(
+            exStyle, atom, "Overlay", style,
+            x, y, width, height,
+            0, 0, hInstance, None
+        )
+
+        win32gui.ShowWindow(hwnd, win32con.SW_SHOW)
+        return hwnd
+
+    def create_dib_buffers(self, width, height, base):
+        # Dua DIB section dibuat sekali; pikselnya diakses langsung sebagai array NumPy
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = width
+        bmi.bmiHeader.biHeight = -height
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = win32con.BI_RGB
+        bmi.bmiHeader.biSizeImage = 0
+
+        self.screen_dc = self.user32.GetDC(0)
+        self.buffers = []
+        for _ in range(2):
+            memdc = self.gdi32.CreateCompatibleDC(self.screen_dc)
+            ppvBits = ctypes.c_void_p()
+            hbitmap = self.gdi32.CreateDIBSection(memdc, ctypes.byref(bmi), win32con.DIB_RGB_COLORS, ctypes.byref(ppvBits), None, 0)
+            oldbmp = self.gdi32.SelectObject(memdc, hbitmap)
+            raw = (ctypes.c_ubyte * (width * height * 4)).from_address(ppvBits.value)
+            pixels = np.ctypeslib.as_array(raw).reshape(height, width, 4)
+            np.copyto(pixels, base)
+            self.buffers.append({"memdc": memdc, "hbitmap": hbitmap, "oldbmp": oldbmp, "pixels": pixels, "overlay": None})
+        self.back_index = 0
+
+    def release_dib_buffers(self):
+        for buffer in self.buffers:
+            self.gdi32.SelectObject(buffer["memdc"], buffer["oldbmp"])
+            self.gdi32.DeleteObject(buffer["hbitmap"])
+            self.gdi32.DeleteDC(buffer["memdc"])
+        self.buffers = []
+        if self.screen_dc:
+            self.user32.ReleaseDC(0, self.screen_dc)
+            self.screen_dc = None
+
+    def create_surface(self, origin, size, base):
+        self.origin = tuple(origin)
+        self.size = tuple(size)
+        self.hwnd_main = self.create_layered_window(*self.size, *self.origin)
+        self.create_dib_buffers(*self.size, base)
+
+    def update_window_bitmap(self, memdc, dirty=None):
+        blend = BLENDFUNCTION()
+        blend.BlendOp = 0
+        blend.BlendFlags = 0
+        blend.SourceConstantAlpha = 255
+        blend.AlphaFormat = 1
+        pt_src = wintypes.POINT(0, 0)
+        size = wintypes.SIZE(*self.size)
+        pt_dest = wintypes.POINT(*self.origin)
+
+        info = UPDATELAYEREDWINDOWINFO()
+        info.cbSize = ctypes.sizeof(UPDATELAYEREDWINDOWINFO)
+        info.hdcDst = self.screen_dc
+        info.pptDst = ctypes.addressof(pt_dest)
+        info.psize = ctypes.addressof(size)
+        info.hdcSrc = memdc
+        info.pptSrc = ctypes.addressof(pt_src)
+        info.crKey = 0
+        info.pblend = ctypes.addressof(blend)
+        info.dwFlags = 0x02
+        # Hanya area yang berubah yang disalin ulang oleh Windows
+        if dirty is not None:
+            x, y, w, h = dirty
+            rect = wintypes.RECT(x, y, x + w, y + h)
+            info.prcDirty = ctypes.addressof(rect)
+        self.user32.UpdateLayeredWindowIndirect(self.hwnd_main, ctypes.byref(info))
+
+    def present(self, dirty=None):
+        # prcDirty hanya menerima satu rect, jadi area kotor digabung jadi bounding box
+        self.update_window_bitmap(self.back_buffer()["memdc"], bounding_rect(dirty) if dirty else None)
+        self.back_index ^= 1
+
+    def register_keys(self, on_next, on_prev):
+        results = []
+        for hot_id, vk, key, action, handler in (
+            (self.HOTKEY_NEXT_ID, self.VK_X, "Alt+X", "Next", on_next),
+            (self.HOTKEY_PREV_ID, self.VK_Z, "Alt+Z", "Prev", on_prev),
+        ):
+            ok = bool(self.user32.RegisterHotKey(self.hwnd_main, hot_id, self.MOD_ALT, vk))
+            if ok:
+                self.handlers[hot_id] = handler
+                self.hotkeys.append(hot_id)
+            results.append((key, action, ok))
+        return results
+
+    def pump_events(self):
+        win32gui.PumpWaitingMessages()
+
+    def close(self):
+        # Hotkey dan window milik thread worker, jadi dilepas dari thread yang sama
+        for hot_id in self.hotkeys:
+            self.user32.UnregisterHotKey(self.hwnd_main, hot_id)
+        self.hotkeys = []
+        self.handlers = {}
+        self.release_dib_buffers()
+        if self.hwnd_main:
+            win32gui.DestroyWindow(self.hwnd_main)
+            self.hwnd_main = None